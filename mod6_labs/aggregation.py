@@ -0,0 +1,238 @@
+"""Columnar aggregation of 3-hourly forecasts into daily summaries."""
+
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, List, Sequence
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+SECONDS_PER_DAY = 86400
+_EPOCH = date(1970, 1, 1)
+
+
+@dataclass
+class DailySummary:
+    """Aggregated forecast for one local calendar day."""
+
+    __slots__ = (
+        "date", "temp_min", "temp_max", "temp_mean", "condition", "icon",
+        "precipitation", "pop_max",
+    )
+
+    date: date
+    temp_min: float
+    temp_max: float
+    temp_mean: float
+    condition: str  # most frequent condition of the day
+    icon: str
+    precipitation: float  # rain + snow, mm
+    pop_max: float  # highest probability of precipitation, 0..1
+
+
+class ForecastColumns:
+    """
+    A forecast stored as parallel arrays, one entry per 3-hourly slot.
+
+    Conditions and icons are interned: ``condition`` holds indexes into
+    ``condition_names`` and ``icon_names``, so grouping works on integers.
+    """
+
+    __slots__ = (
+        "timezone", "dt", "temp", "temp_min", "temp_max", "precipitation",
+        "pop", "condition", "icon", "condition_names", "icon_names",
+    )
+
+    def __init__(self, timezone: int = 0):
+        self.timezone = timezone
+        self.dt = array("q")
+        self.temp = array("d")
+        self.temp_min = array("d")
+        self.temp_max = array("d")
+        self.precipitation = array("d")
+        self.pop = array("d")
+        self.condition = array("H")
+        self.icon = array("H")
+        self.condition_names: List[str] = []
+        self.icon_names: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.dt)
+
+    @classmethod
+    def from_json(cls, data: Dict) -> "ForecastColumns":
+        """Build columns from a raw /forecast response in one pass."""
+        columns = cls(timezone=data.get("city", {}).get("timezone", 0))
+        for item in data.get("list", []):
+            main = item.get("main", {})
+            condition = (item.get("weather") or [{}])[0]
+            columns._append(
+                item.get("dt", 0),
+                main.get("temp", 0),
+                main.get("temp_min", 0),
+                main.get("temp_max", 0),
+                item.get("rain", {}).get("3h", 0) + item.get("snow", {}).get("3h", 0),
+                item.get("pop", 0),
+                condition.get("main", "Clear"),
+                condition.get("icon", "01d"),
+            )
+        return columns
+
+    @classmethod
+    def from_forecast(cls, forecast) -> "ForecastColumns":
+        """Build columns from a parsed ``models.Forecast``."""
+        columns = cls(timezone=forecast.timezone)
+        for p in forecast.points:
+            columns._append(
+                p.dt, p.temp, p.temp_min, p.temp_max, p.rain + p.snow, p.pop,
+                p.condition, p.icon,
+            )
+        return columns
+
+    def _append(self, dt, temp, temp_min, temp_max, precipitation, pop, condition, icon):
+        self.dt.append(dt)
+        self.temp.append(temp)
+        self.temp_min.append(temp_min)
+        self.temp_max.append(temp_max)
+        self.precipitation.append(precipitation)
+        self.pop.append(pop)
+        self.condition.append(_intern(self.condition_names, condition))
+        self.icon.append(_intern(self.icon_names, icon))
+
+    def local_days(self) -> Sequence[int]:
+        """Day number (days since 1970-01-01, city local time) of each slot."""
+        if NUMPY_AVAILABLE:
+            return (np.frombuffer(self.dt, dtype=np.int64) + self.timezone) // SECONDS_PER_DAY
+        return array("q", ((t + self.timezone) // SECONDS_PER_DAY for t in self.dt))
+
+
+def _intern(names: List[str], name: str) -> int:
+    try:
+        return names.index(name)
+    except ValueError:
+        names.append(name)
+        return len(names) - 1
+
+
+def daily_summary(columns: ForecastColumns, max_days: int = 7) -> List[DailySummary]:
+    """
+    Aggregate a forecast into per-day summaries (city local time).
+
+    Uses NumPy grouping when available and a single pure-Python pass
+    otherwise.
+    """
+    return daily_summary_many([columns], max_days)[0]
+
+
+def daily_summary_many(batch: Sequence[ForecastColumns], max_days: int = 7) -> List[List[DailySummary]]:
+    """
+    Aggregate many cities' forecasts at once; results keep the input order.
+
+    With NumPy the whole batch is concatenated and grouped by (city, day)
+    in one vectorized pass, so cost does not grow with per-city overhead.
+    """
+    if NUMPY_AVAILABLE:
+        per_city = _daily_numpy(batch)
+    else:
+        per_city = [_daily_python(columns) for columns in batch]
+    return [days[:max_days] for days in per_city]
+
+
+def _daily_numpy(batch: Sequence[ForecastColumns]) -> List[List[DailySummary]]:
+    results: List[List[DailySummary]] = [[] for _ in batch]
+    batch_sizes = [len(columns) for columns in batch]
+    if not sum(batch_sizes):
+        return results
+
+    # Merge per-city interned names into one table and remap the indexes
+    condition_names: List[str] = []
+    icon_names: List[str] = []
+    condition_parts, icon_parts, day_parts = [], [], []
+    for columns in batch:
+        if not len(columns):
+            continue
+        cond_map = np.array([_intern(condition_names, n) for n in columns.condition_names], dtype=np.int64)
+        icon_map = np.array([_intern(icon_names, n) for n in columns.icon_names], dtype=np.int64)
+        condition_parts.append(cond_map[np.frombuffer(columns.condition, dtype=np.uint16)])
+        icon_parts.append(icon_map[np.frombuffer(columns.icon, dtype=np.uint16)])
+        day_parts.append(columns.local_days())
+
+    def column(name):
+        return np.concatenate([np.frombuffer(getattr(c, name), dtype=np.float64) for c in batch if len(c)])
+
+    city = np.repeat(np.arange(len(batch)), batch_sizes)
+    days = np.concatenate(day_parts)
+    condition = np.concatenate(condition_parts)
+    icon = np.concatenate(icon_parts)
+    n = len(days)
+
+    # Slots are chronological per city, so each (city, day) is one run
+    boundary = np.r_[True, (days[1:] != days[:-1]) | (city[1:] != city[:-1])]
+    starts = np.flatnonzero(boundary)
+    counts = np.diff(np.r_[starts, n])
+
+    temp_min = np.minimum.reduceat(column("temp_min"), starts)
+    temp_max = np.maximum.reduceat(column("temp_max"), starts)
+    temp_mean = np.add.reduceat(column("temp"), starts) / counts
+    precipitation = np.add.reduceat(column("precipitation"), starts)
+    pop_max = np.maximum.reduceat(column("pop"), starts)
+
+    # Dominant condition: count (group, condition) pairs in one bincount;
+    # ties go to the condition that appears first in the day
+    n_conditions = len(condition_names)
+    group = np.repeat(np.arange(len(starts)), counts)
+    pair = group * n_conditions + condition
+    tally = np.bincount(pair, minlength=len(starts) * n_conditions)
+    first_seen = np.full(len(starts) * n_conditions, n)
+    np.minimum.at(first_seen, pair, np.arange(n))
+    score = tally * (n + 1) - first_seen
+    dominant = score.reshape(len(starts), n_conditions).argmax(axis=1)
+
+    # Icon: the first slot of the group showing the dominant condition
+    matches = condition == dominant[group]
+    first_match = np.minimum.reduceat(np.where(matches, np.arange(n), n), starts)
+
+    for i, start in enumerate(starts):
+        results[city[start]].append(DailySummary(
+            date=_EPOCH + timedelta(days=int(days[start])),
+            temp_min=float(temp_min[i]),
+            temp_max=float(temp_max[i]),
+            temp_mean=float(temp_mean[i]),
+            condition=condition_names[dominant[i]],
+            icon=icon_names[icon[first_match[i]]],
+            precipitation=float(precipitation[i]),
+            pop_max=float(pop_max[i]),
+        ))
+    return results
+
+
+def _daily_python(columns: ForecastColumns) -> List[DailySummary]:
+    days = columns.local_days()
+    results: List[DailySummary] = []
+    start = 0
+    for end in range(1, len(days) + 1):
+        if end < len(days) and days[end] == days[start]:
+            continue
+        tally = Counter(columns.condition[start:end])
+        # Counter keeps first-seen order, so ties go to the earliest condition
+        dominant = max(tally, key=tally.__getitem__)
+        # Slice first: array.index() only takes start/stop from Python 3.10
+        first = start + columns.condition[start:end].index(dominant)
+        results.append(DailySummary(
+            date=_EPOCH + timedelta(days=int(days[start])),
+            temp_min=min(columns.temp_min[start:end]),
+            temp_max=max(columns.temp_max[start:end]),
+            temp_mean=sum(columns.temp[start:end]) / (end - start),
+            condition=columns.condition_names[dominant],
+            icon=columns.icon_names[columns.icon[first]],
+            precipitation=sum(columns.precipitation[start:end]),
+            pop_max=max(columns.pop[start:end]),
+        ))
+        start = end
+    return results
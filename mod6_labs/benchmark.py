@@ -0,0 +1,530 @@
+"""
+Offline performance benchmarks for the weather app.
+
+Starts a local stand-in for the OpenWeatherMap ``/weather`` and
+``/forecast`` endpoints, drives ``WeatherService`` and a headless
+``WeatherApp.update_display`` at several concurrency levels and reports
+p50/p95/p99 latency, throughput, allocations and RSS. Results are saved
+as JSON so runs can be compared between commits::
+
+    python benchmark.py --concurrency 1,8,32 --latency-ms 50
+    python benchmark.py --compare benchmark_results/baseline.json
+
+No API key or network access is needed.
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from urllib.parse import parse_qs, urlsplit
+
+# Benchmarks never talk to the real API or touch the on-disk cache
+os.environ.setdefault("OPENWEATHER_API_KEY", "benchmark")
+os.environ.setdefault("WEATHER_CACHE_DB", "")
+
+from cache import TTLCache
+from models import CurrentWeather, Forecast
+from ratelimit import TokenBucket
+from weather_service import WeatherService, WeatherServiceError
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+APP_DIR = Path(__file__).parent
+RESULTS_DIR = APP_DIR / "benchmark_results"
+
+# Smallest valid PNG, served for icon requests
+_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000100e221bc330000000049454e44ae426082"
+)
+
+
+class MockOpenWeatherMap:
+    """
+    Local HTTP/1.1 stand-in for the OpenWeatherMap API.
+
+    Serves ``/data/2.5/weather``, ``/data/2.5/forecast`` and icon images
+    with keep-alive, so the real httpx connection pool is exercised. Each
+    response waits ``latency`` (+/- ``jitter``) seconds; ``error_rate`` of
+    requests fail with a 503. Forecasts carry ``forecast_points`` entries
+    and every JSON body gets ``padding`` extra bytes to model larger
+    payloads.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        forecast_points: int = 40,
+        padding: int = 0,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.forecast_points = forecast_points
+        self.padding = padding
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.Task] = set()
+        self.base_url = ""
+
+    async def start(self) -> str:
+        """Start listening on a free local port; returns the base URL."""
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+        return self.base_url
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            # Finish idle keep-alive connections before the loop shuts down
+            for task in self._connections:
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                target = head.split(b" ", 2)[1].decode()
+                status, content_type, body = await self._respond(target)
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    "Connection: keep-alive\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, IndexError, asyncio.CancelledError):
+            pass  # client went away or the server is shutting down
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _respond(self, target: str):
+        self.requests += 1
+        url = urlsplit(target)
+        delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if url.path.startswith("/img/wn/"):
+            return 200, "image/png", _PNG
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors += 1
+            return 503, "application/json", b'{"cod": 503, "message": "unavailable"}'
+
+        city = parse_qs(url.query).get("q", ["Benchmark"])[0]
+        if url.path.endswith("/weather"):
+            payload = weather_payload(city)
+        elif url.path.endswith("/forecast"):
+            payload = forecast_payload(city, self.forecast_points)
+        else:
+            return 404, "application/json", b'{"cod": "404", "message": "not found"}'
+        if self.padding:
+            payload["padding"] = "x" * self.padding
+        return 200, "application/json", json.dumps(payload).encode()
+
+
+def weather_payload(city: str, dt: int = 1700000000) -> Dict:
+    """A realistic current-weather response body."""
+    seed = sum(map(ord, city))
+    return {
+        "coord": {"lon": 121.0, "lat": 14.6},
+        "weather": [{"id": 801, "main": "Clouds", "description": "few clouds", "icon": "02d"}],
+        "main": {
+            "temp": 25 + seed % 10,
+            "feels_like": 27 + seed % 10,
+            "temp_min": 24,
+            "temp_max": 33,
+            "pressure": 1010,
+            "humidity": 60 + seed % 30,
+        },
+        "wind": {"speed": 3.5, "deg": 90},
+        "clouds": {"all": seed % 100},
+        "dt": dt,
+        "sys": {"country": "PH", "sunrise": dt - 20000, "sunset": dt + 20000},
+        "timezone": 28800,
+        "id": seed,
+        "name": city,
+        "cod": 200,
+    }
+
+
+def forecast_payload(city: str, points: int = 40, dt: int = 1700000000) -> Dict:
+    """A realistic 3-hourly forecast response body."""
+    conditions = [("Rain", "10d"), ("Clouds", "03d"), ("Clear", "01d")]
+    items = []
+    for i in range(points):
+        condition, icon = conditions[i % 3]
+        temp = 24 + (i * 7) % 10
+        items.append({
+            "dt": dt + i * 10800,
+            "main": {"temp": temp, "feels_like": temp + 2, "temp_min": temp - 1, "temp_max": temp + 1, "humidity": 70},
+            "weather": [{"id": 500, "main": condition, "description": condition.lower(), "icon": icon}],
+            "clouds": {"all": 40},
+            "wind": {"speed": 2.0, "deg": 80},
+            "pop": 0.3,
+            "rain": {"3h": 0.5} if condition == "Rain" else {},
+            "dt_txt": "",
+        })
+    return {
+        "cod": "200",
+        "cnt": points,
+        "list": items,
+        "city": {"name": city, "country": "PH", "timezone": 28800},
+    }
+
+
+class HeadlessStorage:
+    """In-memory stand-in for ``page.client_storage``; every session is one user."""
+
+    def __init__(self):
+        self.data = {"weather.user_id": "benchmark"}
+
+    async def get_async(self, key):
+        return self.data.get(key)
+
+    async def set_async(self, key, value):
+        self.data[key] = value
+
+
+class HeadlessPage:
+    """Just enough of ``ft.Page`` to build and update a WeatherApp without a client."""
+
+    def __init__(self):
+        self.title = None
+        self.theme_mode = None
+        self.bgcolor = None
+        self.padding = None
+        self.on_close = None
+        self.session_id = "benchmark"
+        self.window = SimpleNamespace(width=None, height=None, resizable=None, center=lambda: None)
+        self.client_storage = HeadlessStorage()
+        self.controls = []
+        self.updates = 0
+        self.controls_sent = 0
+
+    def add(self, *controls):
+        self.controls.extend(controls)
+
+    def update(self, *controls):
+        self.updates += 1
+        self.controls_sent += len(controls) or 1
+
+    def run_task(self, handler, *args):
+        return asyncio.ensure_future(handler(*args))
+
+
+def create_service(base_url: str, **kwargs) -> WeatherService:
+    """A WeatherService whose endpoints point at the mock server."""
+    service = WeatherService(
+        cache=TTLCache(max_entries=100_000),
+        # Measure the client, not the plan's rate limit
+        rate_limiter=TokenBucket(rate=1e9, capacity=1e9),
+        typed=True,
+        **kwargs,
+    )
+    service.endpoints = {
+        name: dataclasses.replace(endpoint, url=base_url + urlsplit(endpoint.url).path)
+        for name, endpoint in service.endpoints.items()
+    }
+    return service
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(q * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024  # peak, not current
+
+
+async def drive(op: Callable[[int], Awaitable], ops: int, concurrency: int):
+    """Run ``op(i)`` for i in range(ops) with ``concurrency`` workers."""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(ops))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                await op(i)
+            except WeatherServiceError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def measure(name: str, setup, ops: int, concurrency: int, track_allocations: bool = True) -> Dict:
+    """
+    Benchmark one scenario.
+
+    ``setup()`` returns ``(op, teardown)``; it runs once for the timed pass
+    and once more for the allocation pass, so tracemalloc's overhead never
+    skews the latencies.
+    """
+    op, teardown = await setup()
+    try:
+        latencies, errors, wall = await drive(op, ops, concurrency)
+    finally:
+        await teardown()
+
+    result = {
+        "scenario": name,
+        "concurrency": concurrency,
+        "ops": ops,
+        "errors": errors,
+        "wall_s": round(wall, 4),
+        "throughput_ops_s": round(ops / wall, 1) if wall else 0.0,
+    }
+    latencies.sort()
+    for label, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+        result[f"{label}_ms"] = round(percentile(latencies, q) * 1000, 3)
+    result["mean_ms"] = round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0
+    result["max_ms"] = round(latencies[-1] * 1000, 3) if latencies else 0.0
+
+    if track_allocations:
+        op, teardown = await setup()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            await drive(op, ops, concurrency)
+            after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            await teardown()
+        diff = after.compare_to(before, "filename")
+        result["alloc_peak_bytes"] = peak
+        result["alloc_retained_bytes"] = sum(stat.size_diff for stat in diff)
+        result["alloc_retained_blocks"] = sum(stat.count_diff for stat in diff)
+
+    result["rss_bytes"] = rss_bytes()
+    return result
+
+
+async def run_benchmarks(args) -> Dict:
+    """Run every scenario at every concurrency level."""
+    server = MockOpenWeatherMap(
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        forecast_points=args.forecast_points,
+        padding=args.payload_padding,
+        seed=args.seed,
+    )
+    base_url = await server.start()
+    results = []
+    run = 0
+
+    def service_scenario(call: str, warm: bool):
+        async def setup():
+            nonlocal run
+            run += 1
+            prefix = f"City{run}-"
+            service = create_service(base_url)
+            await service.start()
+            method = getattr(service, call)
+            if warm:
+                # A small working set, fetched once: every timed call is a cache hit
+                for i in range(16):
+                    await method(f"{prefix}{i}")
+                op = lambda i: method(f"{prefix}{i % 16}")
+            else:
+                op = lambda i: method(f"{prefix}{i}")  # unique city: always a miss
+            return op, service.close
+        return setup
+
+    scenarios = [
+        ("service.get_weather[cold]", service_scenario("get_weather", warm=False)),
+        ("service.get_weather_bundle[cold]", service_scenario("get_weather_bundle", warm=False)),
+        ("service.get_weather[warm]", service_scenario("get_weather", warm=True)),
+    ]
+    for name, setup in scenarios:
+        for concurrency in args.concurrency:
+            result = await measure(name, setup, args.requests, concurrency, not args.no_alloc)
+            results.append(result)
+            report(result)
+
+    result = await measure("ui.update_display", ui_scenario(base_url), args.renders, 1, not args.no_alloc)
+    results.append(result)
+    report(result)
+
+    mock = {"requests": server.requests, "errors": server.errors}
+    await server.close()
+    return {"results": results, "mock_server": mock}
+
+
+def ui_scenario(base_url: str):
+    """Headless WeatherApp rendering alternating cities, including first paint."""
+
+    async def setup():
+        import main
+        from icon_cache import IconCache
+        from server import SharedResources
+
+        assets = tempfile.TemporaryDirectory()
+        service = create_service(base_url)
+        icon_cache = IconCache(assets.name)
+        icon_cache.REMOTE_URL = base_url + "/img/wn/{name}"
+        app = main.WeatherApp(HeadlessPage(), shared=SharedResources(service, icon_cache))
+        bundles = [
+            (
+                CurrentWeather.from_json(weather_payload(city)),
+                Forecast.from_json(forecast_payload(city)),
+            )
+            for city in ("Manila", "Tokyo", "Cebu", "Davao")
+        ]
+
+        async def op(i):
+            app.update_display(*bundles[i % len(bundles)])
+
+        async def teardown():
+            await icon_cache.close()
+            await service.close()
+            assets.cleanup()
+
+        return op, teardown
+
+    return setup
+
+
+def report(result: Dict):
+    print(
+        f"{result['scenario']:<34} c={result['concurrency']:<4} "
+        f"p50={result['p50_ms']:>8.2f}ms p95={result['p95_ms']:>8.2f}ms "
+        f"p99={result['p99_ms']:>8.2f}ms {result['throughput_ops_s']:>9.1f} ops/s "
+        f"errors={result['errors']}"
+        + (f" peak={result['alloc_peak_bytes'] / 1024:.0f}KiB" if "alloc_peak_bytes" in result else "")
+        + f" rss={result['rss_bytes'] / 2**20:.1f}MiB"
+    )
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=APP_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """List scenarios whose p95 or throughput regressed by more than ``threshold``."""
+    def key(r):
+        return r["scenario"], r["concurrency"]
+
+    old = {key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'}:")
+    for result in current["results"]:
+        before = old.get(key(result))
+        if before is None:
+            continue
+        p95 = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"] if before["p95_ms"] else 0.0
+        tput = (
+            (result["throughput_ops_s"] - before["throughput_ops_s"]) / before["throughput_ops_s"]
+            if before["throughput_ops_s"] else 0.0
+        )
+        flag = ""
+        if p95 > threshold or tput < -threshold:
+            flag = "  REGRESSION"
+            regressions.append(f"{result['scenario']} c={result['concurrency']}")
+        print(f"{result['scenario']:<34} c={result['concurrency']:<4} p95 {p95:+7.1%}  throughput {tput:+7.1%}{flag}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--concurrency", default="1,8,32",
+                        type=lambda s: [int(c) for c in s.split(",") if c.strip()],
+                        help="comma-separated concurrency levels (default: 1,8,32)")
+    parser.add_argument("--requests", type=int, default=200, help="operations per service scenario")
+    parser.add_argument("--renders", type=int, default=500, help="update_display calls in the UI scenario")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="mock server response latency")
+    parser.add_argument("--jitter-ms", type=float, default=5.0, help="random +/- latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of API calls answered with 503")
+    parser.add_argument("--forecast-points", type=int, default=40, help="entries per forecast response")
+    parser.add_argument("--payload-padding", type=int, default=0, help="extra bytes per JSON response")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-alloc", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--output", help="results file (default: benchmark_results/<timestamp>.json)")
+    parser.add_argument("--compare", help="baseline results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative p95/throughput change reported as a regression")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    started = datetime.now()
+    data = {
+        "commit": git_commit(),
+        "timestamp": started.isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+    }
+    data.update(asyncio.run(run_benchmarks(args)))
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{started:%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(data, indent=2))
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if compare(data, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
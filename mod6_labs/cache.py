@@ -0,0 +1,272 @@
+"""Response cache for the weather service."""
+
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from models import MODEL_TYPES
+
+
+# Bump when the payload layout or a model's fields change; rows written
+# with another version are dropped on load instead of being decoded
+SCHEMA_VERSION = 1
+
+
+def _encode(value: Any) -> str:
+    """Serialize a cached value, tagging typed models with their class."""
+    if type(value).__name__ in MODEL_TYPES:
+        value = {"__model__": type(value).__name__, "data": value.to_dict()}
+    return json.dumps({"version": SCHEMA_VERSION, "value": value})
+
+
+def _decode(payload: str) -> Any:
+    """
+    Inverse of ``_encode``.
+
+    Raises:
+        ValueError: If the payload is not JSON or has another schema version
+        KeyError, TypeError: If a typed model's data doesn't fit its class
+    """
+    envelope = json.loads(payload)
+    if not isinstance(envelope, dict) or envelope.get("version") != SCHEMA_VERSION:
+        raise ValueError("cache payload has an unsupported schema version")
+    value = envelope["value"]
+    if isinstance(value, dict) and "__model__" in value:
+        return MODEL_TYPES[value["__model__"]].from_dict(value["data"])
+    return value
+
+
+def normalize_city(city: str) -> str:
+    """Normalize a city name so "  manila", "Manila" and "MANILA " match."""
+    return " ".join(city.split()).casefold()
+
+
+def make_cache_key(endpoint: str, city: str, units: str) -> Tuple[str, str, str]:
+    """Build the cache key for an API response."""
+    return (endpoint, normalize_city(city), units)
+
+
+@dataclass
+class CacheStats:
+    """Counters describing cache effectiveness."""
+
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    refreshes: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.stale_hits + self.misses
+        return (self.hits + self.stale_hits) / total if total else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        data = asdict(self)
+        data["hit_ratio"] = self.hit_ratio
+        return data
+
+
+@dataclass
+class CacheEntry:
+    """A cached response together with its freshness information."""
+
+    value: Any
+    fetched_at: float
+    expires_at: float
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (time.time() if now is None else now) < self.expires_at
+
+
+class TTLCache:
+    """
+    In-memory cache with per-entry TTL and LRU eviction.
+
+    Expired entries are kept for up to ``max_stale`` seconds so callers can
+    serve them immediately while a fresh copy is fetched in the background
+    (stale-while-revalidate). Any object implementing ``get``/``set``/
+    ``delete``/``clear`` and a ``stats`` attribute can be used in its place.
+    """
+
+    def __init__(self, max_entries: int = 256, max_stale: float = 3600):
+        self.max_entries = max_entries
+        self.max_stale = max_stale
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        """
+        Look up a cached entry.
+
+        Returns:
+            The entry (fresh or still within the stale window), or None
+        """
+        entry = self._entries.get(key)
+        now = time.time()
+
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        if entry.is_fresh(now):
+            self.stats.hits += 1
+        elif now - entry.expires_at <= self.max_stale:
+            self.stats.stale_hits += 1
+        else:
+            del self._entries[key]
+            self.stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> CacheEntry:
+        """Store a value that stays fresh for ``ttl`` seconds."""
+        now = time.time()
+        entry = CacheEntry(value=value, fetched_at=now, expires_at=now + ttl)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self.stats.evictions += 1
+            self._on_evict(evicted)
+        return entry
+
+    def peek(self, key: Hashable) -> Optional[CacheEntry]:
+        """Return an entry without touching LRU order or counters."""
+        return self._entries.get(key)
+
+    def delete(self, key: Hashable):
+        """Remove a single entry if present."""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove all entries."""
+        self._entries.clear()
+
+    def close(self):
+        """Release any resources held by the cache."""
+
+    def _on_evict(self, key: Hashable):
+        """Hook called after an entry is dropped by LRU eviction."""
+
+
+class SQLiteCache(TTLCache):
+    """
+    TTL/LRU cache persisted to a SQLite database.
+
+    Lookups are served from memory exactly like ``TTLCache``; every write
+    is also stored on disk (WAL mode) with its fetch and expiry timestamps
+    so a restarted app can render the last known data before any network
+    call. Keys must come from ``make_cache_key``.
+    """
+
+    COMPACT_EVERY = 50  # writes between on-disk compactions
+
+    def __init__(self, path: str, max_entries: int = 256, max_stale: float = 3600):
+        super().__init__(max_entries=max_entries, max_stale=max_stale)
+        self.path = path
+        self._writes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                endpoint TEXT NOT NULL,
+                city TEXT NOT NULL,
+                units TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (endpoint, city, units)
+            )
+            """
+        )
+        self._conn.commit()
+        self.compact()
+        self._load()
+
+    def _load(self):
+        """Warm the in-memory layer from disk, oldest first (LRU order)."""
+        rows = self._conn.execute(
+            "SELECT endpoint, city, units, payload, fetched_at, expires_at "
+            "FROM responses ORDER BY fetched_at"
+        )
+        unreadable = []
+        for endpoint, city, units, payload, fetched_at, expires_at in rows.fetchall():
+            key = (endpoint, city, units)
+            try:
+                value = _decode(payload)
+            except (TypeError, KeyError, ValueError):
+                # Written by another version of the app, or corrupt
+                unreadable.append(key)
+                continue
+            self._entries[key] = CacheEntry(
+                value=value,
+                fetched_at=fetched_at,
+                expires_at=expires_at,
+            )
+        if unreadable:
+            self._conn.executemany(
+                "DELETE FROM responses WHERE endpoint = ? AND city = ? AND units = ?",
+                unreadable,
+            )
+            self._conn.commit()
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> CacheEntry:
+        entry = super().set(key, value, ttl)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+            (*key, _encode(value), entry.fetched_at, entry.expires_at),
+        )
+        self._conn.commit()
+
+        self._writes += 1
+        if self._writes % self.COMPACT_EVERY == 0:
+            self.compact()
+        return entry
+
+    def delete(self, key: Hashable):
+        super().delete(key)
+        self._delete_row(key)
+
+    def clear(self):
+        super().clear()
+        self._conn.execute("DELETE FROM responses")
+        self._conn.commit()
+
+    def compact(self):
+        """Drop rows past the stale window and trim to ``max_entries``."""
+        cutoff = time.time() - self.max_stale
+        self._conn.execute("DELETE FROM responses WHERE expires_at < ?", (cutoff,))
+        self._conn.execute(
+            "DELETE FROM responses WHERE rowid NOT IN ("
+            "SELECT rowid FROM responses ORDER BY fetched_at DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    def _on_evict(self, key: Hashable):
+        self._delete_row(key)
+
+    def _delete_row(self, key: Hashable):
+        self._conn.execute(
+            "DELETE FROM responses WHERE endpoint = ? AND city = ? AND units = ?",
+            key,
+        )
+        self._conn.commit()
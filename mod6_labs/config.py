@@ -1,11 +1,42 @@
 """Configuration management for the Weather App."""
 
 import os
+from pathlib import Path
+from typing import Callable, List, Union
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Relative file settings are resolved against the app directory, so the
+# same files are used whatever directory the app is launched from
+APP_DIR = Path(__file__).resolve().parent
+
+# Problems found while reading settings; reported by Config.validate()
+# instead of failing the import, so the UI can start and show them
+_errors: List[str] = []
+
+
+class ConfigError(ValueError):
+    """Raised by Config.validate() when the configuration is unusable."""
+    pass
+
+
+def _getenv_number(name: str, default: str, cast: Callable) -> Union[int, float]:
+    """Read a numeric setting, falling back to the default if it is malformed."""
+    value = os.getenv(name, default)
+    try:
+        return cast(value)
+    except ValueError:
+        _errors.append(f"{name} must be a number, got {value!r}.")
+        return cast(default)
+
+
+def _app_path(value: str) -> str:
+    """Resolve a path setting against APP_DIR; absolute and empty values are kept."""
+    return str(APP_DIR / value) if value else value
+
+
 class Config:
     """Application configuration."""
     
@@ -21,21 +52,106 @@ class Config:
     APP_WIDTH = 400
     APP_HEIGHT = 600
     
+    # Server mode: serve the app to browsers, sharing one weather service
+    # (pool, cache, rate limiter) across all sessions
+    SERVER_MODE = os.getenv("WEATHER_SERVER_MODE", "0") == "1"
+    SERVER_PORT = _getenv_number("WEATHER_SERVER_PORT", "8550", int)
+    
     # API Settings
     UNITS = "metric"  # metric, imperial, or standard
-    TIMEOUT = 10  # seconds
+    TIMEOUT = 10  # seconds (default for endpoints without their own)
+    
+    # Per-endpoint timeouts in seconds: connect, read, and total per call
+    # (total includes retries)
+    CONNECT_TIMEOUT = _getenv_number("WEATHER_CONNECT_TIMEOUT", "3", float)
+    WEATHER_READ_TIMEOUT = _getenv_number("WEATHER_READ_TIMEOUT", "5", float)
+    WEATHER_TOTAL_TIMEOUT = _getenv_number("WEATHER_TOTAL_TIMEOUT", "8", float)
+    FORECAST_READ_TIMEOUT = _getenv_number("WEATHER_FORECAST_READ_TIMEOUT", "6", float)
+    FORECAST_TOTAL_TIMEOUT = _getenv_number("WEATHER_FORECAST_TOTAL_TIMEOUT", "8", float)
+    # Hard deadline for one search (current weather + forecast)
+    SEARCH_DEADLINE = _getenv_number("WEATHER_SEARCH_DEADLINE", "8", float)
+    
+    # Weather icons are cached under <ASSETS_DIR>/icons and served locally
+    ASSETS_DIR = os.getenv("WEATHER_ASSETS_DIR", "assets")
+    ICON_ARCHIVE = os.getenv("WEATHER_ICON_ARCHIVE", "assets/icons.zip")  # offline prefill
+    ICON_INLINE = os.getenv("WEATHER_ICON_INLINE", "0") == "1"  # send icons as base64
+    ICON_PRELOAD = os.getenv("WEATHER_ICON_PRELOAD", "0") == "1"  # fetch all icons at startup
+    
+    # Return parsed CurrentWeather/Forecast models instead of raw JSON
+    TYPED_MODELS = os.getenv("WEATHER_TYPED_MODELS", "0") == "1"
+    
+    # Background refresh of recent/pinned cities ahead of cache expiry
+    REFRESH_ENABLED = os.getenv("WEATHER_REFRESH_ENABLED", "1") == "1"
+    REFRESH_BUDGET_PER_MINUTE = _getenv_number("WEATHER_REFRESH_BUDGET", "10", float)  # API calls
+    PINNED_CITIES = [c.strip() for c in os.getenv("WEATHER_PINNED_CITIES", "").split(",") if c.strip()]
+    
+    # Search history
+    HISTORY_SIZE = _getenv_number("WEATHER_HISTORY_SIZE", "5", int)
+    HISTORY_FLUSH_DELAY = 0.5  # seconds; bursts of searches are saved once
+    
+    # Type-ahead search: fetch after this many ms of idle typing (0 = off)
+    TYPEAHEAD_DEBOUNCE_MS = _getenv_number("WEATHER_TYPEAHEAD_DEBOUNCE_MS", "0", int)
+    TYPEAHEAD_MIN_CHARS = 3
+    
+    # HTTP Connection Pool Settings
+    MAX_CONNECTIONS = _getenv_number("WEATHER_MAX_CONNECTIONS", "20", int)
+    MAX_KEEPALIVE_CONNECTIONS = _getenv_number("WEATHER_MAX_KEEPALIVE", "10", int)
+    KEEPALIVE_EXPIRY = _getenv_number("WEATHER_KEEPALIVE_EXPIRY", "30", float)  # seconds
+    HTTP2 = os.getenv("WEATHER_HTTP2", "1") == "1"  # needs the "h2" package
+    
+    # Rate Limiting (free OpenWeatherMap plan: 60 calls/minute)
+    RATE_LIMIT_PER_MINUTE = _getenv_number("WEATHER_RATE_LIMIT_PER_MINUTE", "60", float)
+    RATE_LIMIT_BURST = _getenv_number("WEATHER_RATE_LIMIT_BURST", "10", float)
+    
+    # Retry / Circuit Breaker Settings
+    MAX_RETRIES = _getenv_number("WEATHER_MAX_RETRIES", "2", int)
+    RETRY_BASE_DELAY = _getenv_number("WEATHER_RETRY_BASE_DELAY", "0.5", float)  # seconds
+    RETRY_MAX_DELAY = _getenv_number("WEATHER_RETRY_MAX_DELAY", "8", float)  # seconds
+    CIRCUIT_FAILURE_THRESHOLD = _getenv_number("WEATHER_CIRCUIT_THRESHOLD", "0.5", float)
+    CIRCUIT_WINDOW = 20  # most recent calls considered
+    CIRCUIT_MIN_CALLS = 5
+    CIRCUIT_RESET_TIMEOUT = _getenv_number("WEATHER_CIRCUIT_RESET_TIMEOUT", "30", float)  # seconds
+    
+    # Batch Fetch Settings
+    BATCH_CONCURRENCY = _getenv_number("WEATHER_BATCH_CONCURRENCY", "8", int)
+    GROUP_MAX_IDS = 20  # city IDs per call to the group endpoint
+    
+    # Response Cache Settings
+    CACHE_ENABLED = os.getenv("WEATHER_CACHE_ENABLED", "1") == "1"
+    CACHE_MAX_ENTRIES = _getenv_number("WEATHER_CACHE_MAX_ENTRIES", "256", int)
+    CACHE_TTL_WEATHER = _getenv_number("WEATHER_CACHE_TTL_WEATHER", "600", float)  # seconds
+    CACHE_TTL_FORECAST = _getenv_number("WEATHER_CACHE_TTL_FORECAST", "1800", float)  # seconds
+    CACHE_MAX_STALE = _getenv_number("WEATHER_CACHE_MAX_STALE", "3600", float)  # seconds
+    CACHE_STALE_WHILE_REVALIDATE = os.getenv("WEATHER_CACHE_SWR", "1") == "1"
+    # SQLite file for the persistent cache; set to an empty value to keep
+    # the cache in memory only
+    CACHE_DB_PATH = _app_path(os.getenv("WEATHER_CACHE_DB", "weather_cache.db"))
+    
+    # Metrics export: Prometheus text endpoint on this port (0 = off) and/or
+    # a JSON snapshot written every METRICS_JSON_INTERVAL seconds
+    METRICS_PORT = _getenv_number("WEATHER_METRICS_PORT", "0", int)
+    METRICS_JSON_PATH = os.getenv("WEATHER_METRICS_JSON", "")
+    METRICS_JSON_INTERVAL = _getenv_number("WEATHER_METRICS_JSON_INTERVAL", "30", float)  # seconds
     
     @classmethod
     def validate(cls):
-        """Validate that required configuration is present."""
+        """
+        Validate that required configuration is present.
+        
+        Not run on import: the app calls it before its first request and
+        shows the message in the UI.
+        
+        Raises:
+            ConfigError: If the API key is missing or a setting is malformed
+        """
+        problems = list(_errors)
         if not cls.API_KEY:
-            raise ValueError(
+            problems.insert(0,
                 "OPENWEATHER_API_KEY not found. "
                 "Please create a .env file with your API key.\n"
                 "Example .env file:\n"
                 "OPENWEATHER_API_KEY=your_api_key_here"
             )
+        if problems:
+            raise ConfigError("\n".join(problems))
         return True
-
-# Validate configuration on import
-Config.validate()
\ No newline at end of file
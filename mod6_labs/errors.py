@@ -0,0 +1,16 @@
+"""Weather service exceptions (importable without loading the HTTP stack)."""
+
+
+class WeatherServiceError(Exception):
+    """Custom exception for weather service errors."""
+    pass
+
+
+class TransientServiceError(WeatherServiceError):
+    """Upstream failure that may succeed later (timeouts, 5xx, 429)."""
+    pass
+
+
+class CircuitOpenError(TransientServiceError):
+    """Raised without calling upstream while the circuit breaker is open."""
+    pass
@@ -0,0 +1,128 @@
+"""Search history persistence."""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryStore:
+    """
+    Recent searches for one user, persisted off the event loop.
+
+    ``add()`` only updates memory and schedules a flush; bursts of updates
+    within ``flush_delay`` seconds are written once. Writes run in a thread
+    executor, one at a time, and go to a temp file that is renamed over the
+    target, so a crash never leaves a truncated file behind. Changes made
+    while a write is in flight are written after it.
+    """
+
+    def __init__(self, path: Path, capacity: int = 5, flush_delay: float = 0.5):
+        self.path = Path(path)
+        self.capacity = capacity
+        self.flush_delay = flush_delay
+        self.writes = 0
+        self.items: List[str] = self._load()
+        self._version = 0  # bumped on every change
+        self._saved_version = 0  # version of the items last written
+        self._flush_task: Optional[asyncio.Task] = None
+        self._writing: Optional[asyncio.Future] = None
+
+    @classmethod
+    def for_user(cls, directory: Path, user_id: str, **kwargs) -> "HistoryStore":
+        """Build the store for a user; ``"default"`` keeps the legacy file."""
+        if user_id == "default":
+            return cls(Path(directory) / "search_history.json", **kwargs)
+        safe_id = re.sub(r"[^A-Za-z0-9_-]", "_", user_id)[:64]
+        return cls(Path(directory) / "history" / f"{safe_id}.json", **kwargs)
+
+    def _load(self) -> List[str]:
+        """Load history from file (once, at startup)."""
+        try:
+            with open(self.path, "r") as f:
+                items = json.load(f)
+        except (OSError, ValueError):
+            return []
+        if not isinstance(items, list):
+            return []
+        return [str(item) for item in items][:self.capacity]
+
+    def add(self, city: str):
+        """Move a city to the front of the history and schedule a save."""
+        city = city.title()
+        if city in self.items:
+            self.items.remove(city)
+        self.items.insert(0, city)
+        del self.items[self.capacity:]
+        self._version += 1
+        self._schedule_flush()
+
+    @property
+    def dirty(self) -> bool:
+        """Whether there are changes not yet written to disk."""
+        return self._saved_version != self._version
+
+    def _schedule_flush(self):
+        if self._flush_task is not None and not self._flush_task.done():
+            return  # the pending flush keeps writing until nothing is unsaved
+        try:
+            self._flush_task = asyncio.get_running_loop().create_task(self._delayed_flush())
+        except RuntimeError:
+            # No event loop: write synchronously
+            version = self._version
+            if self._write(list(self.items)):
+                self._saved_version = version
+
+    async def _delayed_flush(self):
+        await asyncio.sleep(self.flush_delay)
+        while self.dirty:
+            if not await self.flush():
+                break  # the error was reported; retry on the next change
+
+    async def flush(self) -> bool:
+        """Write the current history to disk in a worker thread."""
+        # One write at a time, so an older snapshot never lands after a newer one
+        while self._writing is not None and not self._writing.done():
+            await asyncio.shield(self._writing)
+        version, snapshot = self._version, list(self.items)
+        self._writing = asyncio.get_running_loop().run_in_executor(None, self._write, snapshot)
+        # Shielded: a cancelled flush leaves the write running, and the
+        # next flush waits for it
+        if not await asyncio.shield(self._writing):
+            return False
+        self._saved_version = max(self._saved_version, version)
+        return True
+
+    async def close(self):
+        """Write any unsaved changes immediately."""
+        task = self._flush_task
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        if self.dirty:
+            await self.flush()
+
+    def _write(self, items: List[str]) -> bool:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".history-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(items, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            self.writes += 1
+            return True
+        except OSError as e:
+            logger.warning("Error saving history: %s", e)
+            return False
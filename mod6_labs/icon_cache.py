@@ -0,0 +1,158 @@
+"""Local cache for OpenWeatherMap condition icons."""
+
+import asyncio
+import base64
+import logging
+import re
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+import httpx
+
+# Every icon code OpenWeatherMap uses, day ("d") and night ("n") variants
+ICON_CODES = tuple(
+    f"{code}{variant}"
+    for code in ("01", "02", "03", "04", "09", "10", "11", "13", "50")
+    for variant in ("d", "n")
+)
+ICON_SIZES = ("", "@2x", "@4x")
+
+_ICON_FILE = re.compile(r"^\d\d[dn](@[24]x)?\.png$")
+
+logger = logging.getLogger(__name__)
+
+
+class IconCache:
+    """
+    Serves weather icons from the Flet assets directory.
+
+    Icons are stored as ``<assets_dir>/icons/<code><size>.png`` and served
+    by Flet as ``/icons/<code><size>.png``. A missing icon is downloaded in
+    the background the first time it is asked for; until then the remote
+    URL is returned so rendering never waits. The directory can also be
+    prefilled from a zip archive for offline installs. With ``inline`` set,
+    icons are returned as base64 so no separate image request is made.
+    """
+
+    REMOTE_URL = "https://openweathermap.org/img/wn/{name}"
+
+    def __init__(self, assets_dir: str, inline: bool = False, archive: Optional[str] = None):
+        self.icons_dir = Path(assets_dir) / "icons"
+        self.inline = inline
+        self.downloads = 0
+        self.errors = 0  # failed directory setup, archive reads and downloads
+        self._available: Set[str] = set()
+        self._base64: Dict[str, str] = {}
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+        try:
+            self.icons_dir.mkdir(parents=True, exist_ok=True)
+            if archive and Path(archive).exists():
+                self.prefill_from_archive(archive)
+            self._available.update(p.name for p in self.icons_dir.glob("*.png"))
+        except OSError as e:
+            self.errors += 1
+            logger.warning("Icon cache unavailable, using remote icons: %s", e)
+
+    def register_metrics(self, metrics):
+        """Expose download and error counts on a metrics registry."""
+        metrics.counter("icon_cache_downloads_total", lambda: self.downloads)
+        metrics.counter("icon_cache_errors_total", lambda: self.errors)
+
+    @staticmethod
+    def filename(icon: str, size: str = "") -> Optional[str]:
+        """Return the icon's file name, or None if the code is not valid."""
+        name = f"{icon}{size}.png"
+        return name if _ICON_FILE.match(name) else None
+
+    def source(self, icon: str, size: str = "") -> Tuple[str, Optional[str]]:
+        """
+        Resolve an icon for an ``ft.Image``.
+
+        Returns:
+            Tuple of (src, src_base64); src_base64 is only set in inline mode
+            for icons that are cached locally
+        """
+        name = self.filename(icon, size)
+        if name is None:
+            return self.REMOTE_URL.format(name=f"{icon}{size}.png"), None
+
+        if name not in self._available:
+            self._schedule_download(name)
+            return self.REMOTE_URL.format(name=name), None
+
+        if self.inline:
+            return f"/icons/{name}", self._read_base64(name)
+        return f"/icons/{name}", None
+
+    def prefill_from_archive(self, archive: str) -> int:
+        """Extract bundled icons from a zip archive; returns the count added."""
+        added = 0
+        with zipfile.ZipFile(archive) as zf:
+            for info in zf.infolist():
+                name = Path(info.filename).name
+                if not _ICON_FILE.match(name) or (self.icons_dir / name).exists():
+                    continue
+                (self.icons_dir / name).write_bytes(zf.read(info))
+                self._available.add(name)
+                added += 1
+        return added
+
+    async def preload(self, icons: Iterable[str] = ICON_CODES, sizes: Iterable[str] = ICON_SIZES):
+        """Download every missing icon (e.g. in the background at startup)."""
+        names = [self.filename(icon, size) for icon in icons for size in sizes]
+        tasks = [
+            self._schedule_download(name)
+            for name in names
+            if name and name not in self._available
+        ]
+        await asyncio.gather(*[t for t in tasks if t], return_exceptions=True)
+
+    async def close(self):
+        """Cancel pending downloads and close the download client."""
+        for task in self._pending.values():
+            task.cancel()
+        self._pending.clear()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _schedule_download(self, name: str) -> Optional[asyncio.Task]:
+        if name in self._pending:
+            return self._pending[name]
+        try:
+            task = asyncio.get_running_loop().create_task(self._download(name))
+        except RuntimeError:
+            return None  # no event loop: stay on remote URLs
+        self._pending[name] = task
+        return task
+
+    async def _download(self, name: str):
+        try:
+            if self._client is None:
+                self._client = httpx.AsyncClient(timeout=10)
+            response = await self._client.get(self.REMOTE_URL.format(name=name))
+            if response.status_code != 200:
+                return
+            # Write then rename so a half-written file is never served
+            tmp = self.icons_dir / f".{name}.tmp"
+            tmp.write_bytes(response.content)
+            tmp.replace(self.icons_dir / name)
+            self._available.add(name)
+            self.downloads += 1
+        except (httpx.HTTPError, OSError) as e:
+            # Try again the next time the icon is needed
+            self.errors += 1
+            logger.debug("Icon download failed for %s: %s", name, e)
+        finally:
+            self._pending.pop(name, None)
+
+    def _read_base64(self, name: str) -> Optional[str]:
+        if name not in self._base64:
+            try:
+                self._base64[name] = base64.b64encode((self.icons_dir / name).read_bytes()).decode()
+            except OSError:
+                return None
+        return self._base64[name]
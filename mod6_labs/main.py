@@ -1,27 +1,212 @@
 """Premium Dark Theme Weather Application"""
 
+import time
+_LAUNCHED = time.perf_counter()
+
 import flet as ft
 import asyncio
-import json
+import importlib
+import logging
+import sys
+import uuid
 from pathlib import Path
-from datetime import datetime
-from weather_service import WeatherService, WeatherServiceError
-from config import Config
+from datetime import datetime, timedelta, timezone
+from config import Config, ConfigError
+from errors import WeatherServiceError
+from history import HistoryStore
+from metrics import Metrics
+from models import CurrentWeather, Forecast
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = Path(__file__).parent
+ASSETS_DIR = APP_DIR / Config.ASSETS_DIR
+
+# Imported in a worker thread on first use, so the window opens without
+# waiting for httpx, sqlite3 and NumPy
+BACKEND_MODULES = ("weather_service", "icon_cache", "refresher", "aggregation")
+
+# Set by --profile-startup: log when the shell and the backend are ready
+PROFILE_STARTUP = False
+
+
+def import_backend():
+    """Import the HTTP stack and data modules."""
+    for name in BACKEND_MODULES:
+        importlib.import_module(name)
 
 
 class WeatherApp:
     """Premium Dark Theme Weather Application"""
     
-    def __init__(self, page: ft.Page):
+    def __init__(self, page: ft.Page, shared=None):
         self.page = page
-        self.weather_service = WeatherService()
-        self.history_file = Path("search_history.json")
-        self.search_history = self.load_history()
+        # In server mode the service and icon cache are shared by all
+        # sessions and outlive this one
+        self.shared = shared
+        if shared is not None:
+            self.weather_service = shared.service
+            self.icon_cache = shared.icon_cache
+            self.refresher = shared.refresher
+            self.exporter = shared.exporter
+            self.metrics = shared.service.metrics
+            shared.register(self)
+        else:
+            # Built by start_backend() once the UI shell is on screen
+            self.weather_service = None
+            self.icon_cache = None
+            self.refresher = None
+            self.exporter = None
+            # UI timings land in the service's registry so one export covers both
+            self.metrics = Metrics()
+            self.metrics.gauge("ui_session_bytes", lambda: self.memory_usage()["bytes"])
+        self._backend = None
+        # Web sessions only know whose history to show once the browser
+        # answers; startup() opens their store
+        self.user_id = "default" if shared is None else None
+        self.history = self.create_history(self.user_id) if shared is None else None
         self.current_weather_data = None
         self.current_city = None
+        # Latest-wins search tracking: each search gets a generation number
+        # and results from superseded searches are dropped
+        self._search_generation = 0
+        self._search_future = None
+        self._search_city = None
+        self._search_explicit = False
+        self._debounce_future = None
+        self.weather_view = None
+        self.forecast_view = None
         self.setup_page()
         self.build_ui()
     
+    async def startup(self):
+        """Finish starting up once the UI shell is on screen."""
+        self.log_startup("UI shell")
+        if self.history is None:
+            self.user_id = await self.resolve_user_id()
+            self.history = self.create_history(self.user_id)
+        try:
+            Config.validate()
+        except ConfigError as err:
+            self.error_text.value = f"❌ {str(err)}"
+            self.error_text.visible = True
+            self.page.update()
+            return
+        # Painting the last city needs the HTTP stack and cache; without
+        # one, they are loaded on the first search instead
+        if self.search_history or Config.PINNED_CITIES or self.shared is not None:
+            await self.ensure_backend()
+            self.show_cached_weather()
+    
+    async def ensure_backend(self):
+        """Load and start the backend once; concurrent callers share the work."""
+        if self._backend is None:
+            self._backend = asyncio.ensure_future(self.start_backend())
+        try:
+            # Shielded: a superseded search must not abort the shared startup
+            await asyncio.shield(self._backend)
+        except Exception:
+            if self._backend.done():
+                self._backend = None  # let the next search try again
+            raise
+    
+    async def start_backend(self):
+        """Import, build and start the weather service and its helpers."""
+        if self.shared is None:
+            Config.validate()
+            await asyncio.get_running_loop().run_in_executor(None, import_backend)
+            from icon_cache import IconCache
+            from metrics import MetricsExporter
+            from refresher import BackgroundRefresher
+            from weather_service import WeatherService
+            
+            self.weather_service = WeatherService(typed=True, metrics=self.metrics)
+            self.icon_cache = IconCache(
+                ASSETS_DIR,
+                inline=Config.ICON_INLINE,
+                archive=str(APP_DIR / Config.ICON_ARCHIVE),
+            )
+            self.icon_cache.register_metrics(self.metrics)
+            self.refresher = BackgroundRefresher(
+                self.weather_service,
+                budget_per_minute=Config.REFRESH_BUDGET_PER_MINUTE,
+            )
+            self.exporter = MetricsExporter(
+                self.metrics,
+                port=Config.METRICS_PORT,
+                json_path=Config.METRICS_JSON_PATH,
+                interval=Config.METRICS_JSON_INTERVAL,
+            )
+        
+        await self.weather_service.start()
+        await self.exporter.start()
+        if Config.ICON_PRELOAD:
+            self.page.run_task(self.icon_cache.preload)
+        if Config.REFRESH_ENABLED:
+            self.refresher.pin(Config.PINNED_CITIES)
+            for city in self.search_history:
+                self.refresher.touch(city)
+            self.refresher.start()
+        self.log_startup("backend")
+    
+    def log_startup(self, stage: str):
+        """Report time since launch for --profile-startup."""
+        if PROFILE_STARTUP:
+            print(f"Startup: {stage} ready {(time.perf_counter() - _LAUNCHED) * 1000:.0f} ms after launch")
+    
+    def show_cached_weather(self):
+        """Paint the last searched city from the on-disk cache, if any."""
+        if not self.search_history:
+            return
+        city = self.search_history[0]
+        weather, forecast = self.weather_service.get_cached_bundle(city)
+        if weather is None:
+            return
+        self.current_weather_data = weather
+        self.current_city = city
+        self.update_display(weather, forecast)
+    
+    async def shutdown(self):
+        """Release pooled connections when the session ends."""
+        if self.shared is not None:
+            self.shared.unregister(self)
+            if self.history is not None:
+                # Other tabs of the same user may still be using it
+                await self.shared.release_history(self.user_id)
+            return
+        await self.history.close()
+        if self._backend is None:
+            return  # never searched: nothing was started
+        try:
+            await self._backend
+        except Exception:
+            return
+        await self.refresher.stop()
+        await self.exporter.stop()
+        await self.weather_service.close()
+        await self.icon_cache.close()
+    
+    def memory_usage(self) -> dict:
+        """Estimate the memory held by this session's state and control tree."""
+        from server import control_tree_sizeof, deep_sizeof
+        state_bytes = deep_sizeof(self.search_history) + deep_sizeof(self.current_weather_data)
+        # The weather views exist before they are first attached to the page
+        controls_bytes, controls = control_tree_sizeof(
+            list(self.page.controls) + [self.weather_view, self.forecast_view]
+        )
+        return {
+            "session_id": getattr(self.page, "session_id", None),
+            "current_city": self.current_city,
+            "state_bytes": state_bytes,
+            "controls_bytes": controls_bytes,
+            "controls": controls,
+            "bytes": state_bytes + controls_bytes,
+        }
+    
+    def on_close(self, e):
+        """Handle page/session close."""
+        self.page.run_task(self.shutdown)
+    
     def setup_page(self):
         """Configure page settings."""
         self.page.title = Config.APP_TITLE
@@ -32,33 +217,44 @@ class WeatherApp:
         self.page.window.height = 720
         self.page.window.resizable = True
         self.page.window.center()
+        self.page.on_close = self.on_close
     
-    def load_history(self):
-        """Load search history from file."""
-        if self.history_file.exists():
-            try:
-                with open(self.history_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
-    
-    def save_history(self):
-        """Save search history to file."""
+    async def resolve_user_id(self) -> str:
+        """Identify the user whose history this session shows."""
+        if self.shared is None:
+            return "default"
+        # Web sessions: a random ID kept in the browser's local storage.
+        # The async calls matter: the blocking ones wait for a reply that
+        # can only arrive through the event loop they would be blocking
         try:
-            with open(self.history_file, 'w') as f:
-                json.dump(self.search_history, f)
-        except Exception as e:
-            print(f"Error saving history: {e}")
+            user_id = await self.page.client_storage.get_async("weather.user_id")
+            if not isinstance(user_id, str) or not user_id:
+                user_id = uuid.uuid4().hex
+                await self.page.client_storage.set_async("weather.user_id", user_id)
+            return user_id
+        except Exception:
+            return getattr(self.page, "session_id", None) or "default"
+    
+    def create_history(self, user_id: str) -> HistoryStore:
+        """Open the search history of a user."""
+        if self.shared is not None:
+            return self.shared.history_for(user_id)
+        return HistoryStore.for_user(
+            APP_DIR,
+            user_id,
+            capacity=Config.HISTORY_SIZE,
+            flush_delay=Config.HISTORY_FLUSH_DELAY,
+        )
+    
+    @property
+    def search_history(self):
+        """Recent searches, most recent first."""
+        return self.history.items if self.history is not None else []
     
     def add_to_history(self, city: str):
         """Add city to search history."""
-        city = city.title()
-        if city in self.search_history:
-            self.search_history.remove(city)
-        self.search_history.insert(0, city)
-        self.search_history = self.search_history[:5]
-        self.save_history()
+        if self.history is not None:
+            self.history.add(city)
     
     def build_ui(self):
         """Build the premium dark UI."""
@@ -73,6 +269,7 @@ class WeatherApp:
             text_size=14,
             expand=True,
             on_submit=self.on_search,
+            on_change=self.on_city_change,
         )
         
         # Search container
@@ -170,13 +367,68 @@ class WeatherApp:
             )
         )
     
-    def on_search(self, e):
+    # The handlers are async so Flet runs them on the event loop, not on
+    # executor threads: all search state is then only touched from one thread
+    
+    async def on_search(self, e):
         """Handle search."""
-        self.page.run_task(self.fetch_weather)
+        self.cancel_pending_typeahead()
+        city = self.city_input.value.strip() if self.city_input.value else ""
+        self.start_search(city)
     
-    async def fetch_weather(self):
-        """Fetch weather data."""
+    async def on_city_change(self, e):
+        """Debounced type-ahead: search once typing has paused."""
+        if Config.TYPEAHEAD_DEBOUNCE_MS <= 0:
+            return
+        self.cancel_pending_typeahead()
         city = self.city_input.value.strip() if self.city_input.value else ""
+        if len(city) < Config.TYPEAHEAD_MIN_CHARS:
+            return
+        self._debounce_future = asyncio.ensure_future(self.debounced_search(city))
+    
+    async def debounced_search(self, city: str):
+        """Wait for the debounce interval, then search."""
+        await asyncio.sleep(Config.TYPEAHEAD_DEBOUNCE_MS / 1000)
+        self.start_search(city, show_errors=False)
+    
+    def cancel_pending_typeahead(self):
+        """Drop a type-ahead search that has not fired yet."""
+        if self._debounce_future is not None and not self._debounce_future.done():
+            self._debounce_future.cancel()
+        self._debounce_future = None
+    
+    def start_search(self, city: str, show_errors: bool = True):
+        """
+        Start a search, cancelling any search it supersedes.
+        
+        Must run on the event loop. ``show_errors`` is False for type-ahead
+        searches, which are also kept out of the history and the refresher.
+        """
+        search_running = self._search_future is not None and not self._search_future.done()
+        
+        # Enter + click for the same city: keep the search already running,
+        # unless it is a type-ahead one that an explicit search should replace
+        same_city = city and city.casefold() == (self._search_city or "").casefold()
+        if search_running and same_city and (self._search_explicit or not show_errors):
+            return
+        if search_running:
+            self._search_future.cancel()
+        
+        self._search_generation += 1
+        self._search_city = city
+        self._search_explicit = show_errors
+        self._search_future = asyncio.ensure_future(
+            self.fetch_weather(city, self._search_generation, show_errors)
+        )
+    
+    def is_current_search(self, generation) -> bool:
+        """Check whether a search is still the latest one."""
+        return generation is None or generation == self._search_generation
+    
+    async def fetch_weather(self, city: str = None, generation: int = None, show_errors: bool = True):
+        """Fetch weather data."""
+        if city is None:
+            city = self.city_input.value.strip() if self.city_input.value else ""
         
         if not city:
             self.error_text.value = "❌ Please enter a city name"
@@ -189,121 +441,121 @@ class WeatherApp:
         self.page.update()
         
         try:
-            weather = await self.weather_service.get_weather(city)
-            forecast = await self.weather_service.get_forecast(city)
+            await self.ensure_backend()
+            started = time.perf_counter()
+            weather, forecast = await self.weather_service.get_weather_bundle(city)
+            self.metrics.observe("ui_search_seconds", time.perf_counter() - started)
+            
+            # A newer search started while this one was waiting; drop it
+            if not self.is_current_search(generation):
+                return
             
             self.current_weather_data = weather
             self.current_city = city
-            self.add_to_history(city)
+            # Type-ahead runs on partial names such as "Lon": only explicit
+            # searches are remembered and kept fresh
+            if show_errors:
+                self.add_to_history(city)
+                self.refresher.touch(city)
             
             self.update_display(weather, forecast)
             
-        except WeatherServiceError as err:
-            self.error_text.value = f"❌ {str(err)}"
-            self.error_text.visible = True
+            if forecast is None:
+                self.error_text.value = "⚠️ Forecast is unavailable right now. Showing current conditions only."
+                self.error_text.visible = True
+            
+        except (ConfigError, WeatherServiceError) as err:
+            self.metrics.inc("ui_errors_total", kind=type(err).__name__)
+            if show_errors and self.is_current_search(generation):
+                self.error_text.value = f"❌ {str(err)}"
+                self.error_text.visible = True
         except Exception as err:
-            import traceback
-            print(f"ERROR: {traceback.format_exc()}")
-            self.error_text.value = f"❌ Error: {str(err)}"
-            self.error_text.visible = True
+            self.metrics.inc("ui_errors_total", kind="unexpected")
+            logger.exception("Unexpected error while searching for %r", city)
+            if show_errors and self.is_current_search(generation):
+                self.error_text.value = f"❌ Error: {str(err)}"
+                self.error_text.visible = True
         finally:
-            self.loading.visible = False
-            self.page.update()
+            # Cancelled or superseded searches leave the UI to the newer one
+            if self.is_current_search(generation):
+                self.loading.visible = False
+                self.page.update()
     
-    def update_display(self, weather: dict, forecast: dict):
-        """Update the weather display."""
-        # Extract weather data
-        city_name = weather.get("name", "Unknown")
-        country = weather.get("sys", {}).get("country", "")
-        temp = weather.get("main", {}).get("temp", 0)
-        feels_like = weather.get("main", {}).get("feels_like", 0)
-        description = weather.get("weather", [{}])[0].get("description", "").title()
-        icon = weather.get("weather", [{}])[0].get("icon", "01d")
-        wind = weather.get("wind", {}).get("speed", 0)
-        humidity = weather.get("main", {}).get("humidity", 0)
-        clouds = weather.get("clouds", {}).get("all", 0)
+    def build_weather_view(self):
+        """Build the result panels on the first result; later searches only change values."""
+        # City + icon
+        self.city_text = ft.Text("", size=30, color="#ffffff", weight=ft.FontWeight.BOLD)
+        self.rain_text = ft.Text("", size=13, color="#9ca3af")
+        self.temp_text = ft.Text("", size=68, color="#ffffff", weight=ft.FontWeight.BOLD)
+        self.weather_icon = ft.Image(src=self.icon_cache.source("01d", "@4x")[0], width=140, height=140)
         
-        # Hourly data
-        hourly_list = forecast.get("list", [])[:6]
-        hourly_cards = []
-        for item in hourly_list:
-            dt_txt = item.get("dt_txt", "")
-            time_str = dt_txt.split(" ")[1][:5] if " " in dt_txt else "12:00"
-            hr = int(time_str.split(":")[0])
-            ampm = "AM" if hr < 12 else "PM"
-            hr12 = hr if hr <= 12 else hr - 12
-            if hr12 == 0: hr12 = 12
-            
-            hourly_cards.append(
-                ft.Container(
-                    content=ft.Column(
-                        controls=[
-                            ft.Text(f"{hr12}:00 {ampm}", size=12, color="#6b7280"),
-                            ft.Image(src=f"https://openweathermap.org/img/wn/{item.get('weather', [{}])[0].get('icon', '01d')}@2x.png", width=45, height=45),
-                            ft.Text(f"{item.get('main', {}).get('temp', 0):.0f}°", size=15, color="#ffffff", weight=ft.FontWeight.BOLD),
-                        ],
-                        horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                        spacing=2,
-                    ),
-                    padding=8,
-                )
+        # Hourly slots
+        self.hourly_slots = []
+        for _ in range(6):
+            slot = {
+                "time": ft.Text("", size=12, color="#6b7280"),
+                "icon": ft.Image(src=self.icon_cache.source("01d", "@2x")[0], width=45, height=45),
+                "temp": ft.Text("", size=15, color="#ffffff", weight=ft.FontWeight.BOLD),
+            }
+            slot["card"] = ft.Container(
+                content=ft.Column(
+                    controls=[slot["time"], slot["icon"], slot["temp"]],
+                    horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+                    spacing=2,
+                ),
+                padding=8,
             )
+            self.hourly_slots.append(slot)
         
-        # Daily forecast
-        daily_data = []
-        seen = set()
-        for item in forecast.get("list", []):
-            date_str = item.get("dt_txt", "").split(" ")[0]
-            if date_str and date_str not in seen:
-                seen.add(date_str)
-                dt = datetime.strptime(date_str, "%Y-%m-%d")
-                daily_data.append({
-                    "day": "Today" if len(daily_data) == 0 else dt.strftime("%a"),
-                    "desc": item.get("weather", [{}])[0].get("main", "Clear"),
-                    "icon": item.get("weather", [{}])[0].get("icon", "01d"),
-                    "high": item.get("main", {}).get("temp_max", 0),
-                    "low": item.get("main", {}).get("temp_min", 0),
-                })
-                if len(daily_data) >= 7:
-                    break
-        
-        daily_rows = []
-        for d in daily_data:
-            daily_rows.append(
-                ft.Container(
-                    content=ft.Row(
-                        controls=[
-                            ft.Text(d["day"], size=14, color="#9ca3af", width=50),
-                            ft.Image(src=f"https://openweathermap.org/img/wn/{d['icon']}.png", width=28, height=28),
-                            ft.Text(d["desc"], size=13, color="#6b7280", width=80),
-                            ft.Container(expand=True),
-                            ft.Text(f"{d['high']:.0f}", size=14, color="#ffffff", weight=ft.FontWeight.BOLD),
-                            ft.Text(f"/{d['low']:.0f}", size=14, color="#6b7280"),
-                        ],
-                        vertical_alignment=ft.CrossAxisAlignment.CENTER,
-                    ),
-                    border=ft.border.only(bottom=ft.BorderSide(1, "#2d2d4a")),
-                    padding=ft.padding.symmetric(vertical=10),
-                )
+        # Daily rows
+        self.daily_slots = []
+        for _ in range(7):
+            slot = {
+                "day": ft.Text("", size=14, color="#9ca3af", width=50),
+                "icon": ft.Image(src=self.icon_cache.source("01d")[0], width=28, height=28),
+                "desc": ft.Text("", size=13, color="#6b7280", width=80),
+                "high": ft.Text("", size=14, color="#ffffff", weight=ft.FontWeight.BOLD),
+                "low": ft.Text("", size=14, color="#6b7280"),
+            }
+            slot["row"] = ft.Container(
+                content=ft.Row(
+                    controls=[
+                        slot["day"],
+                        slot["icon"],
+                        slot["desc"],
+                        ft.Container(expand=True),
+                        slot["high"],
+                        slot["low"],
+                    ],
+                    vertical_alignment=ft.CrossAxisAlignment.CENTER,
+                ),
+                border=ft.border.only(bottom=ft.BorderSide(1, "#2d2d4a")),
+                padding=ft.padding.symmetric(vertical=10),
             )
+            self.daily_slots.append(slot)
+        
+        # Air conditions
+        self.feels_like_text = self.condition_value()
+        self.wind_text = self.condition_value()
+        self.humidity_text = self.condition_value()
+        self.uv_text = self.condition_value()
         
-        # Update main panel
-        self.main_panel.content = ft.Column(
+        self.weather_view = ft.Column(
             controls=[
                 # City + Icon row
                 ft.Row(
                     controls=[
                         ft.Column(
                             controls=[
-                                ft.Text(f"{city_name}, {country}", size=30, color="#ffffff", weight=ft.FontWeight.BOLD),
-                                ft.Text(f"Chance of rain: {clouds}%", size=13, color="#9ca3af"),
+                                self.city_text,
+                                self.rain_text,
                                 ft.Container(height=5),
-                                ft.Text(f"{temp:.0f}°", size=68, color="#ffffff", weight=ft.FontWeight.BOLD),
+                                self.temp_text,
                             ],
                             spacing=2,
                         ),
                         ft.Container(expand=True),
-                        ft.Image(src=f"https://openweathermap.org/img/wn/{icon}@4x.png", width=140, height=140),
+                        self.weather_icon,
                     ],
                     vertical_alignment=ft.CrossAxisAlignment.START,
                 ),
@@ -314,7 +566,10 @@ class WeatherApp:
                         controls=[
                             ft.Text("TODAY'S FORECAST", size=12, color="#6b7280", weight=ft.FontWeight.BOLD),
                             ft.Container(height=10),
-                            ft.Row(controls=hourly_cards, alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+                            ft.Row(
+                                controls=[slot["card"] for slot in self.hourly_slots],
+                                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+                            ),
                         ],
                     ),
                     bgcolor="#1e1e38",
@@ -341,15 +596,15 @@ class WeatherApp:
                             ft.Container(height=15),
                             ft.Row(
                                 controls=[
-                                    self.condition_item(ft.Icons.THERMOSTAT, "Real Feel", f"{feels_like:.0f}°"),
-                                    self.condition_item(ft.Icons.AIR, "Wind", f"{wind:.1f} km/h"),
+                                    self.condition_item(ft.Icons.THERMOSTAT, "Real Feel", self.feels_like_text),
+                                    self.condition_item(ft.Icons.AIR, "Wind", self.wind_text),
                                 ],
                             ),
                             ft.Container(height=10),
                             ft.Row(
                                 controls=[
-                                    self.condition_item(ft.Icons.WATER_DROP, "Humidity", f"{humidity}%"),
-                                    self.condition_item(ft.Icons.WB_SUNNY, "UV Index", "3"),
+                                    self.condition_item(ft.Icons.WATER_DROP, "Humidity", self.humidity_text),
+                                    self.condition_item(ft.Icons.WB_SUNNY, "UV Index", self.uv_text),
                                 ],
                             ),
                         ],
@@ -363,19 +618,101 @@ class WeatherApp:
             scroll=ft.ScrollMode.AUTO,
         )
         
-        # Update forecast panel
-        self.forecast_panel.content = ft.Column(
+        self.forecast_view = ft.Column(
             controls=[
                 ft.Text("7-DAY FORECAST", size=13, color="#6b7280", weight=ft.FontWeight.BOLD),
                 ft.Container(height=10),
-                ft.Column(controls=daily_rows, spacing=0),
+                ft.Column(controls=[slot["row"] for slot in self.daily_slots], spacing=0),
             ],
             scroll=ft.ScrollMode.AUTO,
         )
+    
+    def set_icon(self, image: ft.Image, icon: str, size: str, changed: list):
+        """Point an image at a (locally cached) weather icon."""
+        src, src_base64 = self.icon_cache.source(icon, size)
+        before = len(changed)
+        self.set_prop(image, "src", src, changed)
+        self.set_prop(image, "src_base64", src_base64, changed)
+        if len(changed) - before > 1:
+            changed.pop()
+    
+    @staticmethod
+    def set_prop(control, name: str, value, changed: list):
+        """Set a control property, recording the control if it changed."""
+        if getattr(control, name) != value:
+            setattr(control, name, value)
+            changed.append(control)
+    
+    def update_display(self, weather: CurrentWeather, forecast: Forecast = None):
+        """Update the weather display."""
+        from aggregation import ForecastColumns, daily_summary
         
-        self.page.update()
+        started = time.perf_counter()
+        if self.weather_view is None:
+            self.build_weather_view()
+        points = forecast.points if forecast else []
+        tz_offset = timedelta(seconds=forecast.timezone if forecast else weather.timezone)
+        changed = []
+        set_prop = self.set_prop
+        
+        # Current conditions
+        set_prop(self.city_text, "value", f"{weather.city_name}, {weather.country}", changed)
+        set_prop(self.rain_text, "value", f"Chance of rain: {weather.clouds}%", changed)
+        set_prop(self.temp_text, "value", f"{weather.temp:.0f}°", changed)
+        self.set_icon(self.weather_icon, weather.icon, "@4x", changed)
+        set_prop(self.feels_like_text, "value", f"{weather.feels_like:.0f}°", changed)
+        set_prop(self.wind_text, "value", f"{weather.wind_speed:.1f} km/h", changed)
+        set_prop(self.humidity_text, "value", f"{weather.humidity}%", changed)
+        set_prop(self.uv_text, "value", "3", changed)
+        
+        # Hourly data (shown in the city's local time)
+        for i, slot in enumerate(self.hourly_slots):
+            set_prop(slot["card"], "visible", i < len(points), changed)
+            if i >= len(points):
+                continue
+            point = points[i]
+            hr = (datetime.fromtimestamp(point.dt, timezone.utc) + tz_offset).hour
+            ampm = "AM" if hr < 12 else "PM"
+            hr12 = hr if hr <= 12 else hr - 12
+            if hr12 == 0: hr12 = 12
+            
+            set_prop(slot["time"], "value", f"{hr12}:00 {ampm}", changed)
+            self.set_icon(slot["icon"], point.icon, "@2x", changed)
+            set_prop(slot["temp"], "value", f"{point.temp:.0f}°", changed)
+        
+        # Daily forecast: true per-day high/low and dominant condition
+        days = daily_summary(ForecastColumns.from_forecast(forecast)) if forecast else []
+        for i, slot in enumerate(self.daily_slots):
+            set_prop(slot["row"], "visible", i < len(days), changed)
+            if i >= len(days):
+                continue
+            day = days[i]
+            set_prop(slot["day"], "value", "Today" if i == 0 else day.date.strftime("%a"), changed)
+            self.set_icon(slot["icon"], day.icon, "", changed)
+            set_prop(slot["desc"], "value", day.condition, changed)
+            set_prop(slot["high"], "value", f"{day.temp_max:.0f}", changed)
+            set_prop(slot["low"], "value", f"/{day.temp_min:.0f}", changed)
+        
+        # First result replaces the placeholders; after that only the
+        # controls whose values changed are sent to the client
+        if self.main_panel.content is not self.weather_view:
+            self.main_panel.content = self.weather_view
+            self.forecast_panel.content = self.forecast_view
+            self.page.update()
+            mode = "full"
+        elif changed:
+            self.page.update(*changed)
+            mode = "partial"
+        else:
+            mode = "unchanged"
+        self.metrics.observe("ui_render_seconds", time.perf_counter() - started, mode=mode)
+        self.metrics.inc("ui_controls_updated_total", len(changed))
+    
+    def condition_value(self):
+        """Create the value text of a condition item."""
+        return ft.Text("", size=18, color="#ffffff", weight=ft.FontWeight.BOLD)
     
-    def condition_item(self, icon, label, value):
+    def condition_item(self, icon, label, value_text):
         """Create condition item."""
         return ft.Container(
             content=ft.Row(
@@ -384,7 +721,7 @@ class WeatherApp:
                     ft.Column(
                         controls=[
                             ft.Text(label, size=12, color="#6b7280"),
-                            ft.Text(value, size=18, color="#ffffff", weight=ft.FontWeight.BOLD),
+                            value_text,
                         ],
                         spacing=2,
                     ),
@@ -395,10 +732,28 @@ class WeatherApp:
         )
 
 
-def main(page: ft.Page):
+async def main(page: ft.Page):
     """Main entry point."""
-    WeatherApp(page)
+    shared = None
+    if Config.SERVER_MODE:
+        from server import get_shared_resources
+        shared = get_shared_resources(str(ASSETS_DIR), str(APP_DIR / Config.ICON_ARCHIVE))
+    app = WeatherApp(page, shared=shared)
+    await app.startup()
 
 
 if __name__ == "__main__":
-    ft.app(target=main)
\ No newline at end of file
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if "--profile-startup" in sys.argv:
+        from startup_profile import print_import_report
+        print_import_report(APP_DIR, BACKEND_MODULES)
+        PROFILE_STARTUP = True
+    if Config.SERVER_MODE:
+        ft.app(
+            target=main,
+            view=ft.AppView.WEB_BROWSER,
+            port=Config.SERVER_PORT,
+            assets_dir=str(ASSETS_DIR),
+        )
+    else:
+        ft.app(target=main, assets_dir=str(ASSETS_DIR))
\ No newline at end of file
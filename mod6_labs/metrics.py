@@ -0,0 +1,316 @@
+"""Lightweight latency/throughput metrics and tracing hooks."""
+
+import asyncio
+import bisect
+import json
+import logging
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# OpenTelemetry is optional and slow to import; resolved on the first span
+_tracer = None
+_tracer_loaded = False
+
+
+def _get_tracer():
+    global _tracer, _tracer_loaded
+    if not _tracer_loaded:
+        _tracer_loaded = True
+        try:
+            from opentelemetry import trace as otel_trace
+            _tracer = otel_trace.get_tracer("weather_app")
+        except ImportError:
+            _tracer = None
+    return _tracer
+
+logger = logging.getLogger(__name__)
+
+# Seconds; suits both sub-millisecond renders and multi-second requests
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative buckets, Prometheus style)."""
+
+    __slots__ = ("buckets", "counts", "count", "total")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Metrics:
+    """
+    Registry of counters, gauges and histograms.
+
+    Gauges are callables evaluated at export time, so live state (cache
+    size, circuit state, in-flight requests) is read rather than copied.
+    Counters kept elsewhere (retries, cache hits) are read the same way
+    through ``counter()``.
+    Export with ``to_prometheus()`` or ``to_dict()`` / ``write_json()``.
+    """
+
+    def __init__(self):
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self.gauges: Dict[str, Callable[[], float]] = {}
+        self.counter_reads: Dict[str, Callable[[], float]] = {}
+
+    def inc(self, name: str, amount: float = 1, **labels: str):
+        series = self.counters.setdefault(name, {})
+        key = _labels(labels)
+        series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels: str):
+        series = self.histograms.setdefault(name, {})
+        key = _labels(labels)
+        if key not in series:
+            series[key] = Histogram()
+        series[key].observe(value)
+
+    def gauge(self, name: str, read: Callable[[], float]):
+        """Register a gauge whose value is read on export."""
+        self.gauges[name] = read
+
+    def counter(self, name: str, read: Callable[[], float]):
+        """Register a monotonic count kept elsewhere, read on export."""
+        self.counter_reads[name] = read
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """Time a block into a histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[None]:
+        """Open an OpenTelemetry span when the SDK is installed; else no-op."""
+        tracer = _get_tracer()
+        if tracer is None:
+            yield
+            return
+        with tracer.start_as_current_span(name, attributes=attributes):
+            yield
+
+    def to_dict(self) -> Dict:
+        """Snapshot all metrics as plain data."""
+        def series_name(name, labels):
+            return name + _format_labels(labels)
+
+        data: Dict[str, Dict] = {"counters": {}, "gauges": {}, "histograms": {}}
+        for name, series in self.counters.items():
+            for labels, value in series.items():
+                data["counters"][series_name(name, labels)] = value
+        for name, read in self.counter_reads.items():
+            data["counters"][name] = _read_gauge(read)
+        for name, read in self.gauges.items():
+            data["gauges"][name] = _read_gauge(read)
+        for name, series in self.histograms.items():
+            for labels, h in series.items():
+                data["histograms"][series_name(name, labels)] = {
+                    "count": h.count,
+                    "sum": h.total,
+                    "p50": h.quantile(0.5),
+                    "p95": h.quantile(0.95),
+                    "p99": h.quantile(0.99),
+                }
+        data["timestamp"] = time.time()
+        return data
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for name, series in sorted(self.counters.items()):
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in series.items():
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+        for name, read in sorted(self.counter_reads.items()):
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {_read_gauge(read)}")
+        for name, read in sorted(self.gauges.items()):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_read_gauge(read)}")
+        for name, series in sorted(self.histograms.items()):
+            lines.append(f"# TYPE {name} histogram")
+            for labels, h in series.items():
+                cumulative = 0
+                for bound, n in zip(h.buckets, h.counts):
+                    cumulative += n
+                    le = _format_labels(labels, 'le="%s"' % bound)
+                    lines.append(f"{name}_bucket{le} {cumulative}")
+                le = _format_labels(labels, 'le="+Inf"')
+                lines.append(f"{name}_bucket{le} {h.count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {h.total}")
+                lines.append(f"{name}_count{_format_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: str):
+        """Atomically write a JSON snapshot to ``path``."""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp, path)
+
+
+def _read_gauge(read: Callable[[], float]) -> float:
+    try:
+        return float(read())
+    except Exception:
+        return float("nan")
+
+
+class RequestTracer:
+    """
+    Collects connection phase timings for one HTTP request.
+
+    Passed to httpx as the ``trace`` request extension; httpcore reports
+    TCP connect (including DNS resolution), TLS handshake and time to
+    response headers.
+    """
+
+    PHASES = {
+        "connection.connect_tcp": "connect",
+        "connection.start_tls": "tls",
+        "http11.send_request_headers": "send",
+        "http2.send_request_headers": "send",
+        "http11.receive_response_headers": "response",
+        "http2.receive_response_headers": "response",
+    }
+
+    def __init__(self, metrics: Metrics, endpoint: str):
+        self.metrics = metrics
+        self.endpoint = endpoint
+        self._started: Dict[str, float] = {}
+
+    async def __call__(self, event_name: str, info: Dict):
+        prefix, _, stage = event_name.rpartition(".")
+        phase = self.PHASES.get(prefix)
+        if phase is None:
+            return
+        if stage == "started":
+            self._started[phase] = time.perf_counter()
+        elif stage == "complete" and phase in self._started:
+            self.metrics.observe(
+                "weather_http_phase_seconds",
+                time.perf_counter() - self._started.pop(phase),
+                endpoint=self.endpoint,
+                phase=phase,
+            )
+
+
+async def serve_prometheus(metrics: Metrics, port: int, host: str = "127.0.0.1") -> asyncio.AbstractServer:
+    """Serve ``metrics.to_prometheus()`` over plain HTTP (any path)."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+            body = metrics.to_prometheus().encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/plain; version=0.0.4\r\n"
+                + f"Content-Length: {len(body)}\r\n".encode()
+                + b"Connection: close\r\n\r\n"
+                + body
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+async def write_json_periodically(metrics: Metrics, path: str, interval: float):
+    """Write a JSON snapshot every ``interval`` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            metrics.write_json(path)
+        except OSError as e:
+            metrics.inc("metrics_export_errors_total", kind="json")
+            logger.warning("Error writing metrics: %s", e)
+
+
+class MetricsExporter:
+    """
+    Runs the configured exports for a registry: a Prometheus endpoint on
+    ``port`` (0 = off) and/or a JSON snapshot at ``json_path`` every
+    ``interval`` seconds. ``start()`` is idempotent.
+    """
+
+    def __init__(self, metrics: Metrics, port: int = 0, json_path: str = "", interval: float = 30.0):
+        self.metrics = metrics
+        self.port = port
+        self.json_path = json_path
+        self.interval = interval
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writer: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self.port and self._server is None:
+            try:
+                self._server = await serve_prometheus(self.metrics, self.port)
+            except OSError as e:
+                self.metrics.inc("metrics_export_errors_total", kind="endpoint")
+                logger.warning("Metrics endpoint unavailable: %s", e)
+        if self.json_path and self._writer is None:
+            self._writer = asyncio.get_running_loop().create_task(
+                write_json_periodically(self.metrics, self.json_path, self.interval)
+            )
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._writer is not None:
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+            self._writer = None
+            try:
+                self.metrics.write_json(self.json_path)  # final snapshot
+            except OSError as e:
+                self.metrics.inc("metrics_export_errors_total", kind="json")
+                logger.warning("Error writing metrics: %s", e)
@@ -0,0 +1,139 @@
+"""Compact typed models for OpenWeatherMap responses."""
+
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List
+
+try:
+    import orjson
+
+    def loads(data):
+        """Decode JSON using orjson."""
+        return orjson.loads(data)
+except ImportError:
+    import json
+
+    def loads(data):
+        """Decode JSON using the standard library."""
+        return json.loads(data)
+
+
+def _first_condition(data: Dict) -> Dict:
+    conditions = data.get("weather") or [{}]
+    return conditions[0]
+
+
+@dataclass
+class CurrentWeather:
+    """Current conditions, keeping only the fields the UI shows."""
+
+    __slots__ = (
+        "city_name", "country", "dt", "timezone", "temp", "feels_like",
+        "description", "icon", "wind_speed", "humidity", "clouds",
+    )
+
+    city_name: str
+    country: str
+    dt: int
+    timezone: int  # offset from UTC in seconds
+    temp: float
+    feels_like: float
+    description: str
+    icon: str
+    wind_speed: float
+    humidity: int
+    clouds: int
+
+    @classmethod
+    def from_json(cls, data: Dict) -> "CurrentWeather":
+        """Parse a /weather response."""
+        main = data.get("main", {})
+        condition = _first_condition(data)
+        return cls(
+            city_name=data.get("name", "Unknown"),
+            country=data.get("sys", {}).get("country", ""),
+            dt=data.get("dt", 0),
+            timezone=data.get("timezone", 0),
+            temp=main.get("temp", 0),
+            feels_like=main.get("feels_like", 0),
+            description=condition.get("description", ""),
+            icon=condition.get("icon", "01d"),
+            wind_speed=data.get("wind", {}).get("speed", 0),
+            humidity=main.get("humidity", 0),
+            clouds=data.get("clouds", {}).get("all", 0),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CurrentWeather":
+        return cls(**data)
+
+
+@dataclass
+class ForecastPoint:
+    """One 3-hourly forecast slot."""
+
+    __slots__ = (
+        "dt", "temp", "temp_min", "temp_max", "condition", "icon",
+        "pop", "rain", "snow",
+    )
+
+    dt: int  # unix time (UTC)
+    temp: float
+    temp_min: float
+    temp_max: float
+    condition: str  # e.g. "Rain", "Clouds"
+    icon: str
+    pop: float  # probability of precipitation, 0..1
+    rain: float  # mm over the 3 hours
+    snow: float  # mm over the 3 hours
+
+    @classmethod
+    def from_json(cls, item: Dict) -> "ForecastPoint":
+        """Parse one entry of a /forecast ``list``."""
+        main = item.get("main", {})
+        condition = _first_condition(item)
+        return cls(
+            dt=item.get("dt", 0),
+            temp=main.get("temp", 0),
+            temp_min=main.get("temp_min", 0),
+            temp_max=main.get("temp_max", 0),
+            condition=condition.get("main", "Clear"),
+            icon=condition.get("icon", "01d"),
+            pop=item.get("pop", 0),
+            rain=item.get("rain", {}).get("3h", 0),
+            snow=item.get("snow", {}).get("3h", 0),
+        )
+
+
+@dataclass
+class Forecast:
+    """A 5-day / 3-hour forecast."""
+
+    __slots__ = ("timezone", "points")
+
+    timezone: int  # offset from UTC in seconds
+    points: List[ForecastPoint]
+
+    @classmethod
+    def from_json(cls, data: Dict) -> "Forecast":
+        """Parse a /forecast response."""
+        return cls(
+            timezone=data.get("city", {}).get("timezone", 0),
+            points=[ForecastPoint.from_json(item) for item in data.get("list", [])],
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Forecast":
+        return cls(
+            timezone=data["timezone"],
+            points=[ForecastPoint(**point) for point in data["points"]],
+        )
+
+
+# Models that can be stored in (and restored from) a persistent cache
+MODEL_TYPES = {model.__name__: model for model in (CurrentWeather, Forecast)}
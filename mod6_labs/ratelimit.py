@@ -0,0 +1,53 @@
+"""Client-side rate limiting for upstream API calls."""
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Async token-bucket rate limiter.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    Each upstream request takes one token; callers wait when the bucket is
+    empty, so bursts are smoothed to the plan's allowed request rate.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.waits = 0  # acquisitions that had to sleep
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def per_minute(cls, calls: float, burst: float) -> "TokenBucket":
+        """Build a bucket from a calls-per-minute plan limit."""
+        return cls(rate=calls / 60.0, capacity=burst)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1):
+        """Wait until ``tokens`` are available and take them."""
+        # The lock keeps waiters in FIFO order so nobody starves
+        async with self._lock:
+            self._refill()
+            if self.tokens < tokens:
+                self.waits += 1
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= tokens
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take ``tokens`` if available right now; never waits."""
+        self._refill()
+        if self.tokens < tokens:
+            return False
+        self.tokens -= tokens
+        return True
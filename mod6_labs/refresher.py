@@ -0,0 +1,155 @@
+"""Background refresh of recent and pinned cities."""
+
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from cache import normalize_city
+from ratelimit import TokenBucket
+from weather_service import WeatherService, WeatherServiceError
+
+
+class _Tracked:
+    """Refresh state of one city."""
+
+    __slots__ = (
+        "city", "pinned", "last_access", "last_refresh", "hits", "backoff", "not_before",
+    )
+
+    def __init__(self, city: str, pinned: bool = False):
+        self.city = city
+        self.pinned = pinned
+        self.last_access = time.time()
+        self.last_refresh = 0.0
+        self.hits = 0
+        self.backoff = 0.0
+        self.not_before = 0.0
+
+
+class BackgroundRefresher:
+    """
+    Keeps cached weather for recent and pinned cities fresh.
+
+    Every ``tick`` seconds, cached responses (current weather, forecast)
+    that expire within ``lead_time`` are refetched, each on its own TTL,
+    so opening a city renders from cache without a network wait. Intervals adapt to use: a city that was looked at since
+    its last refresh is refreshed on every expiry, while each refresh that
+    goes unused doubles the wait before the next one (up to ``max_backoff``).
+    Unpinned cities untouched for ``idle_timeout`` are dropped. All refreshes
+    share a budget of ``budget_per_minute`` calls on top of the service's
+    own rate limit, so foreground searches always keep headroom. Without
+    a response cache there is nothing to keep fresh, and it does not run.
+    """
+
+    ENDPOINTS = ("weather", "forecast")
+
+    def __init__(
+        self,
+        service: WeatherService,
+        tick: float = 15.0,
+        lead_time: float = 60.0,
+        max_backoff: float = 3600.0,
+        idle_timeout: float = 6 * 3600.0,
+        budget_per_minute: float = 10.0,
+    ):
+        self.service = service
+        self.tick = tick
+        self.lead_time = lead_time
+        self.max_backoff = max_backoff
+        self.idle_timeout = idle_timeout
+        # A refresh costs one call per endpoint that is due
+        self.budget = TokenBucket.per_minute(budget_per_minute, max(2.0, budget_per_minute / 4))
+        self.refreshes = 0
+        self.skipped_budget = 0
+        self._cities: Dict[str, _Tracked] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._cities)
+
+    def touch(self, city: str):
+        """Record that a city was viewed; it becomes (or stays) hot."""
+        key = normalize_city(city)
+        if not key:
+            return
+        tracked = self._cities.get(key)
+        if tracked is None:
+            tracked = self._cities[key] = _Tracked(city)
+        tracked.last_access = time.time()
+        tracked.hits += 1
+        tracked.backoff = 0.0
+        tracked.not_before = 0.0
+
+    def pin(self, cities: Iterable[str]):
+        """Always keep these cities fresh."""
+        for city in cities:
+            key = normalize_city(city)
+            if key:
+                self._cities.setdefault(key, _Tracked(city)).pinned = True
+
+    def start(self):
+        """Start the refresh loop on the running event loop."""
+        if self.service.cache is None:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the refresh loop."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.tick)
+
+    async def run_once(self):
+        """Refresh every city that is due and within budget."""
+        if self.service.cache is None:
+            return
+        now = time.time()
+        due: List[Tuple[_Tracked, List[str]]] = []
+        for key, tracked in list(self._cities.items()):
+            if not tracked.pinned and now - tracked.last_access > self.idle_timeout:
+                del self._cities[key]
+                continue
+            if now < tracked.not_before:
+                continue  # backed off
+            endpoints = self.due_endpoints(tracked.city, now)
+            if endpoints:
+                due.append((tracked, endpoints))
+
+        # Hottest cities first, so a tight budget goes where it matters
+        due.sort(key=lambda d: (not d[0].pinned, -d[0].hits, -d[0].last_access))
+        for tracked, endpoints in due:
+            if not self.budget.try_acquire(len(endpoints)):
+                self.skipped_budget += 1
+                break
+            await self._refresh(tracked, endpoints, now)
+
+    def due_endpoints(self, city: str, now: float) -> List[str]:
+        """The endpoints whose cached response for a city is missing or about to expire."""
+        due = []
+        for endpoint in self.ENDPOINTS:
+            expires_at = self.service.cache_expiry(city, endpoint)
+            if expires_at is None or expires_at - now <= self.lead_time:
+                due.append(endpoint)
+        return due
+
+    async def _refresh(self, tracked: _Tracked, endpoints: List[str], now: float):
+        try:
+            await self.service.refresh_city(tracked.city, endpoints)
+            self.refreshes += 1
+            failed = False
+        except WeatherServiceError:
+            failed = True  # foreground searches still work; just back off
+
+        # Nobody looked at the previous refresh: wait longer next time
+        unused = tracked.last_refresh and tracked.last_access < tracked.last_refresh
+        tracked.last_refresh = now
+        if failed or (unused and not tracked.pinned):
+            tracked.backoff = min(self.max_backoff, max(self.tick, tracked.backoff * 2))
+            tracked.not_before = now + tracked.backoff
@@ -0,0 +1,120 @@
+"""Retry and circuit-breaker policies for upstream API calls."""
+
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter.
+
+    Attempt ``n`` (0-based) waits a random time between 0 and
+    ``min(max_delay, base_delay * 2 ** n)``. A ``Retry-After`` header, when
+    present, takes precedence (capped at ``max_delay``).
+    """
+
+    max_retries: int = 2
+    base_delay: float = 0.5  # seconds
+    max_delay: float = 8.0  # seconds
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Return how long to sleep before retry number ``attempt + 1``."""
+        hinted = parse_retry_after(retry_after)
+        if hinted is not None:
+            return min(self.max_delay, hinted)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Error-rate circuit breaker.
+
+    The outcome of the last ``window`` calls is tracked. Once at least
+    ``min_calls`` have been seen and the failure ratio reaches
+    ``failure_threshold``, the circuit opens and calls fail fast for
+    ``reset_timeout`` seconds. After that a single probe call is let
+    through (half-open): success closes the circuit, failure reopens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: float = 0.5,
+        window: int = 20,
+        min_calls: int = 5,
+        reset_timeout: float = 30.0,
+    ):
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.opened_count = 0
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+
+    @property
+    def failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def allow(self) -> bool:
+        """Return True if a call may be made now."""
+        if self.state == self.CLOSED:
+            return True
+
+        now = time.monotonic()
+        if self.state == self.OPEN:
+            if now - self._opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+
+        # Half-open: one probe at a time (a probe that never reported back,
+        # e.g. because it was cancelled, is replaced after reset_timeout)
+        if self._probe_started is None or now - self._probe_started >= self.reset_timeout:
+            self._probe_started = now
+            return True
+        return False
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            self._outcomes.clear()
+            self.state = self.CLOSED
+            self._probe_started = None
+        self._outcomes.append(True)
+
+    def record_failure(self):
+        if self.state == self.HALF_OPEN:
+            self._trip()
+            return
+        self._outcomes.append(False)
+        if len(self._outcomes) >= self.min_calls and self.failure_rate >= self.failure_threshold:
+            self._trip()
+
+    def _trip(self):
+        self.state = self.OPEN
+        self.opened_count += 1
+        self._opened_at = time.monotonic()
+        self._probe_started = None
@@ -0,0 +1,165 @@
+"""Process-wide shared resources for multi-session (web) server mode."""
+
+import sys
+import time
+import weakref
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from config import APP_DIR, Config
+from history import HistoryStore
+from icon_cache import IconCache
+from metrics import MetricsExporter
+from refresher import BackgroundRefresher
+from weather_service import WeatherService
+
+
+def deep_sizeof(obj: Any, _seen: Optional[set] = None) -> int:
+    """Approximate the memory held by an object graph, in bytes."""
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__slots__"):
+        size += sum(
+            deep_sizeof(getattr(obj, name), seen)
+            for name in obj.__slots__
+            if hasattr(obj, name)
+        )
+    return size
+
+
+def control_tree_sizeof(roots: Iterable[Any]) -> Tuple[int, int]:
+    """
+    Approximate the memory held by Flet control trees: (bytes, controls).
+
+    Each control is counted with its attribute dict; references up the
+    tree (parent, page) and event handlers are not followed.
+    """
+    seen: set = set()
+    visited: set = set()
+    size = count = 0
+    stack = [root for root in roots if root is not None]
+    while stack:
+        control = stack.pop()
+        if id(control) in visited:
+            continue
+        visited.add(id(control))
+        count += 1
+        size += sys.getsizeof(control) + deep_sizeof(vars(control), seen)
+        stack.extend(c for c in control._get_children() if c is not None)
+    return size, count
+
+
+class SharedResources:
+    """
+    One weather service and icon cache shared by every browser session.
+
+    The connection pool, response cache, single-flight table and rate
+    limiter therefore work across sessions: 500 users searching the same
+    city cost one upstream call per TTL instead of one per user. Session
+    state (current city, UI controls) stays on each WeatherApp; search
+    history is per user, so a user's tabs share one store.
+    """
+
+    def __init__(self, service: WeatherService, icon_cache: IconCache):
+        self.service = service
+        self.icon_cache = icon_cache
+        self.refresher = BackgroundRefresher(
+            service, budget_per_minute=Config.REFRESH_BUDGET_PER_MINUTE
+        )
+        self.exporter = MetricsExporter(
+            service.metrics,
+            port=Config.METRICS_PORT,
+            json_path=Config.METRICS_JSON_PATH,
+            interval=Config.METRICS_JSON_INTERVAL,
+        )
+        self.sessions: "weakref.WeakSet" = weakref.WeakSet()
+        self.histories: Dict[str, HistoryStore] = {}
+        self._history_sessions: Dict[str, int] = {}  # user id -> open sessions
+        self._memory: Optional[Dict[str, Any]] = None
+        self._memory_at = 0.0
+        metrics = service.metrics
+        icon_cache.register_metrics(metrics)
+        metrics.gauge("ui_sessions", lambda: len(self.sessions))
+        # Walking every session's control tree is not free: the gauges
+        # share one report per export instead of each making their own
+        for name in ("session_bytes_total", "session_bytes_max", "session_controls_total"):
+            metrics.gauge(f"ui_{name}", lambda name=name: self.cached_memory_report()[name])
+
+    def register(self, app):
+        """Track a session for memory accounting."""
+        self.sessions.add(app)
+
+    def unregister(self, app):
+        """Stop tracking a closed session."""
+        self.sessions.discard(app)
+
+    def history_for(self, user_id: str) -> HistoryStore:
+        """Open a user's search history, shared by all of their sessions."""
+        store = self.histories.get(user_id)
+        if store is None:
+            store = self.histories[user_id] = HistoryStore.for_user(
+                APP_DIR,
+                user_id,
+                capacity=Config.HISTORY_SIZE,
+                flush_delay=Config.HISTORY_FLUSH_DELAY,
+            )
+        self._history_sessions[user_id] = self._history_sessions.get(user_id, 0) + 1
+        return store
+
+    async def release_history(self, user_id: str):
+        """Let go of a user's history; the last session out saves and drops it."""
+        count = self._history_sessions.get(user_id, 0) - 1
+        self._history_sessions[user_id] = max(0, count)
+        if count > 0:
+            return
+        store = self.histories.get(user_id)
+        if store is not None:
+            await store.close()
+        # A new tab may have opened the store while it was saving
+        if self._history_sessions.get(user_id) == 0:
+            self.histories.pop(user_id, None)
+            del self._history_sessions[user_id]
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Per-session and shared memory usage estimates."""
+        sessions = [app.memory_usage() for app in list(self.sessions)]
+        cache = self.service.cache
+        return {
+            "sessions": len(sessions),
+            "session_bytes_total": sum(s["bytes"] for s in sessions),
+            "session_bytes_max": max((s["bytes"] for s in sessions), default=0),
+            "session_controls_total": sum(s["controls"] for s in sessions),
+            "per_session": sessions,
+            "cache_entries": len(cache) if cache is not None else 0,
+            "inflight": len(self.service.inflight),
+            "refresh_tracked": len(self.refresher),
+        }
+
+    def cached_memory_report(self, max_age: float = 5.0) -> Dict[str, Any]:
+        """``memory_report()``, reused for ``max_age`` seconds."""
+        now = time.monotonic()
+        if self._memory is None or now - self._memory_at > max_age:
+            self._memory = self.memory_report()
+            self._memory_at = now
+        return self._memory
+
+
+_shared: Optional[SharedResources] = None
+
+
+def get_shared_resources(assets_dir: str, icon_archive: Optional[str] = None) -> SharedResources:
+    """Return the process-wide resources, creating them on first use."""
+    global _shared
+    if _shared is None:
+        _shared = SharedResources(
+            service=WeatherService(typed=True),
+            icon_cache=IconCache(assets_dir, inline=Config.ICON_INLINE, archive=icon_archive),
+        )
+    return _shared
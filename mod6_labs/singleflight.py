@@ -0,0 +1,73 @@
+"""Request coalescing for duplicate in-flight lookups."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Flight:
+    """A shared in-flight call and the number of callers waiting on it."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time.
+
+    Concurrent callers for the same key all await the same task. The call
+    runs in its own task, so if the caller that started it is cancelled the
+    remaining callers still get the result; the call is only cancelled once
+    every waiter has gone away.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.coalesced = 0  # callers that joined an existing flight
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._flights
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await ``call()`` or join an identical call already in flight.
+
+        Args:
+            key: Identity of the call (e.g. a cache key)
+            call: Zero-argument coroutine function performing the work
+
+        Returns:
+            The result of the shared call
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(call()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+                self._forget(key, flight)
+
+    def cancel_all(self):
+        """Cancel every in-flight call."""
+        for flight in list(self._flights.values()):
+            flight.task.cancel()
+        self._flights.clear()
+
+    def _forget(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
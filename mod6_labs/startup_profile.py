@@ -0,0 +1,73 @@
+"""Per-module import times for ``python main.py --profile-startup``."""
+
+import subprocess
+import sys
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+# (module, self microseconds, cumulative microseconds, nesting depth)
+ImportTime = Tuple[str, int, int, int]
+
+
+def import_times(modules: Iterable[str], cwd: Path) -> List[ImportTime]:
+    """
+    Import ``modules`` in a fresh interpreter under ``-X importtime``.
+
+    A fresh process is needed because everything this one has already
+    imported would otherwise cost nothing. Modules are imported in order,
+    so each one's cumulative time only covers what the earlier ones did
+    not already load.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "; ".join(f"import {m}" for m in modules)],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    if result.returncode != 0:
+        print(result.stderr.strip().splitlines()[-1], file=sys.stderr)
+    return times
+
+
+def print_import_report(cwd: Path, backend: Iterable[str] = (), top: int = 12):
+    """Print what the UI shell (``main``) and the lazy backend cost to import."""
+    backend = tuple(backend)
+    times = import_times(("main",) + backend, cwd)
+
+    # -X importtime lists children before their parent, at depth + 1
+    interpreter = 0
+    children: List[ImportTime] = []
+    for entry in times:
+        name, _, cumulative_us, depth = entry
+        if depth == 1:
+            children.append(entry)
+            continue
+        if depth > 1:
+            continue
+        if name == "main":
+            label = "UI shell"
+        elif name in backend:
+            label = "Backend, on first use"
+        else:
+            interpreter += cumulative_us  # site, encodings, ...
+            children = []
+            continue
+        print(f"\n{label}: import {name} {cumulative_us / 1000:8.1f} ms")
+        for child in sorted(children, key=lambda c: -c[2])[:top]:
+            print(f"    {child[0]:<32} {child[2] / 1000:8.1f} ms")
+        children = []
+
+    shell = sum(t[2] for t in times if t[3] == 0 and t[0] == "main")
+    lazy = sum(t[2] for t in times if t[3] == 0 and t[0] in backend)
+    print(
+        f"\nInterpreter startup: {interpreter / 1000:.1f} ms; "
+        f"imports before the window: {shell / 1000:.1f} ms; "
+        f"deferred to first use: {lazy / 1000:.1f} ms\n"
+    )
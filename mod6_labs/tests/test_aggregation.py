@@ -0,0 +1,67 @@
+import pytest
+
+import aggregation
+from aggregation import ForecastColumns, daily_summary, daily_summary_many
+
+DAY = 86400
+
+
+def make_columns(days=3, timezone=0, offset=0):
+    columns = ForecastColumns(timezone=timezone)
+    conditions = ["Rain", "Clouds", "Clouds", "Rain", "Clear", "Rain", "Clouds", "Clear"]
+    for i in range(days * 8):
+        condition = conditions[(i + offset) % 8]
+        columns._append(
+            i * 3 * 3600, 20 + i % 8, 19 + i % 8, 21 + i % 8,
+            0.5 if condition == "Rain" else 0.0, (i % 8) / 10,
+            condition, f"{condition[:2].lower()}{i}",
+        )
+    return columns
+
+
+def summaries(columns_list, monkeypatch, numpy):
+    if not numpy:
+        monkeypatch.setattr(aggregation, "NUMPY_AVAILABLE", False)
+    return daily_summary_many(columns_list)
+
+
+def test_python_day_values():
+    columns = make_columns(days=1)
+    day = aggregation._daily_python(columns)[0]
+    # Rain, Clouds, Clouds, Rain, ...: Rain and Clouds tie, Rain was seen first
+    assert day.condition == "Rain"
+    assert day.icon == "ra0"
+    assert (day.temp_min, day.temp_max, day.temp_mean) == (19, 28, 23.5)
+    assert day.precipitation == 1.5
+    assert day.pop_max == 0.7
+
+
+def test_python_icon_is_first_slot_of_the_dominant_condition_in_later_days():
+    columns = make_columns(days=2, offset=1)  # Clouds dominate
+    second = aggregation._daily_python(columns)[1]
+    assert second.condition == "Clouds"
+    assert second.icon == "cl8"
+
+
+@pytest.mark.skipif(not aggregation.NUMPY_AVAILABLE, reason="NumPy not installed")
+def test_numpy_and_python_paths_agree(monkeypatch):
+    batch = [make_columns(days=5, timezone=28800), make_columns(days=2, offset=3), ForecastColumns()]
+    with_numpy = daily_summary_many(batch)
+    monkeypatch.setattr(aggregation, "NUMPY_AVAILABLE", False)
+    without = daily_summary_many(batch)
+    assert without == with_numpy
+    assert [len(days) for days in without] == [6, 2, 0]
+
+
+def test_days_follow_the_city_timezone(monkeypatch):
+    monkeypatch.setattr(aggregation, "NUMPY_AVAILABLE", False)
+    columns = ForecastColumns(timezone=-3600)
+    columns._append(0, 10, 10, 10, 0, 0, "Clear", "01d")  # 23:00 the previous day
+    columns._append(3600, 12, 12, 12, 0, 0, "Clear", "01d")
+    days = daily_summary(columns)
+    assert [d.date.day for d in days] == [31, 1]
+
+
+def test_max_days(monkeypatch):
+    monkeypatch.setattr(aggregation, "NUMPY_AVAILABLE", False)
+    assert len(daily_summary(make_columns(days=9))) == 7
@@ -0,0 +1,48 @@
+import pytest
+
+import cache
+from cache import TTLCache, make_cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_fresh_stale_and_expired(clock):
+    c = TTLCache(max_stale=60)
+    c.set("k", "v", ttl=10)
+    assert c.get("k").is_fresh()
+    clock[0] += 30  # expired, inside the stale window
+    entry = c.get("k")
+    assert entry.value == "v" and not entry.is_fresh()
+    clock[0] += 60  # past the stale window
+    assert c.get("k") is None
+    assert "k" not in c
+    assert (c.stats.hits, c.stats.stale_hits, c.stats.misses) == (1, 1, 1)
+
+
+def test_lru_eviction_keeps_recently_read_entries(clock):
+    c = TTLCache(max_entries=2)
+    c.set("a", 1, ttl=10)
+    c.set("b", 2, ttl=10)
+    c.get("a")
+    c.set("c", 3, ttl=10)
+    assert "a" in c and "c" in c and "b" not in c
+    assert c.stats.evictions == 1
+
+
+def test_peek_does_not_count_or_reorder(clock):
+    c = TTLCache(max_entries=2)
+    c.set("a", 1, ttl=10)
+    c.set("b", 2, ttl=10)
+    assert c.peek("a").value == 1
+    c.set("c", 3, ttl=10)
+    assert "a" not in c
+    assert c.stats.hits == 0
+
+
+def test_make_cache_key_normalizes_city():
+    assert make_cache_key("weather", "  new   YORK ", "metric") == ("weather", "new york", "metric")
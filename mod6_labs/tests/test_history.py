@@ -0,0 +1,60 @@
+import asyncio
+import json
+import threading
+
+from history import HistoryStore
+
+
+def test_change_during_a_write_is_saved(tmp_path, monkeypatch):
+    path = tmp_path / "history.json"
+    writing = threading.Event()
+    release = threading.Event()
+    write = HistoryStore._write
+
+    def slow_write(self, items):
+        writing.set()
+        release.wait(5)
+        return write(self, items)
+
+    monkeypatch.setattr(HistoryStore, "_write", slow_write)
+
+    async def run():
+        store = HistoryStore(path, flush_delay=0)
+        store.add("manila")
+        await asyncio.get_running_loop().run_in_executor(None, writing.wait, 5)
+        store.add("tokyo")  # while ['Manila'] is being written
+        release.set()
+        await asyncio.sleep(0.1)  # let that write finish before closing
+        await store.close()
+        return store.items
+
+    items = asyncio.run(run())
+    assert items == ["Tokyo", "Manila"]
+    assert json.loads(path.read_text()) == items
+
+
+def test_burst_is_written_once(tmp_path):
+    async def run():
+        store = HistoryStore(tmp_path / "history.json", flush_delay=0.05)
+        for city in ("a", "b", "c"):
+            store.add(city)
+        await asyncio.sleep(0.2)
+        return store
+
+    store = asyncio.run(run())
+    assert store.writes == 1
+    assert not store.dirty
+
+
+def test_capacity_and_reload(tmp_path):
+    path = tmp_path / "history.json"
+    store = HistoryStore(path, capacity=2)
+    for city in ("paris", "oslo", "PARIS", "rome"):
+        store.add(city)  # no event loop: written immediately
+    assert store.items == ["Rome", "Paris"]
+    assert HistoryStore(path, capacity=2).items == ["Rome", "Paris"]
+
+
+def test_user_ids_map_to_safe_file_names(tmp_path):
+    assert HistoryStore.for_user(tmp_path, "default").path == tmp_path / "search_history.json"
+    assert HistoryStore.for_user(tmp_path, "../x y").path == tmp_path / "history" / "___x_y.json"
@@ -0,0 +1,16 @@
+from metrics import Metrics
+
+
+def test_counts_read_on_export_are_counters():
+    metrics = Metrics()
+    retries = [3]
+    metrics.counter("retries_total", lambda: retries[0])
+    metrics.gauge("inflight", lambda: 1)
+    retries[0] += 1
+
+    text = metrics.to_prometheus()
+    assert "# TYPE retries_total counter\nretries_total 4.0\n" in text
+    assert "# TYPE inflight gauge\ninflight 1.0\n" in text
+    data = metrics.to_dict()
+    assert data["counters"]["retries_total"] == 4.0
+    assert "retries_total" not in data["gauges"]
@@ -0,0 +1,50 @@
+import asyncio
+import time
+
+from refresher import BackgroundRefresher
+
+TTL = {"weather": 600, "forecast": 1800}
+
+
+class FakeService:
+    def __init__(self, cache=True):
+        self.cache = {} if cache else None
+        self.calls = []
+
+    def cache_expiry(self, city, endpoint="weather"):
+        return None if self.cache is None else self.cache.get((endpoint, city))
+
+    async def refresh_city(self, city, endpoints=("weather", "forecast")):
+        self.calls.append(tuple(endpoints))
+        for endpoint in endpoints:
+            self.cache[(endpoint, city)] = time.time() + TTL[endpoint]
+
+
+def test_only_due_endpoints_are_refreshed():
+    service = FakeService()
+    refresher = BackgroundRefresher(service, budget_per_minute=1000)
+    refresher.touch("Paris")
+
+    async def run():
+        await refresher.run_once()
+        await refresher.run_once()  # everything fresh: nothing to do
+        service.cache[("weather", "Paris")] = time.time() + 10
+        refresher.touch("Paris")
+        await refresher.run_once()
+
+    asyncio.run(run())
+    assert service.calls == [("weather", "forecast"), ("weather",)]
+
+
+def test_does_not_run_without_a_cache():
+    service = FakeService(cache=False)
+    refresher = BackgroundRefresher(service)
+    refresher.touch("Paris")
+
+    async def run():
+        refresher.start()
+        await refresher.run_once()
+        return refresher._task
+
+    assert asyncio.run(run()) is None
+    assert service.calls == []
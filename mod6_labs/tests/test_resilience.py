@@ -0,0 +1,70 @@
+import pytest
+
+import resilience
+from resilience import CircuitBreaker, RetryPolicy, parse_retry_after
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_backoff_is_capped_and_honours_retry_after():
+    policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+    assert all(0 <= policy.backoff(10) <= 4.0 for _ in range(50))
+    assert policy.backoff(0, retry_after="2") == 2.0
+    assert policy.backoff(0, retry_after="120") == 4.0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after(" 7 ") == 7.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # in the past
+    assert parse_retry_after("soon") is None
+
+
+def test_opens_only_after_min_calls(clock):
+    breaker = CircuitBreaker(failure_threshold=0.5, min_calls=4)
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opened_count == 1
+    assert not breaker.allow()
+
+
+def test_half_open_allows_one_probe_then_closes(clock):
+    breaker = CircuitBreaker(min_calls=1, reset_timeout=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # the probe is still out
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failure_rate == 0.0
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(min_calls=1, reset_timeout=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opened_count == 2
+    clock[0] += 29
+    assert not breaker.allow()
+
+
+def test_lost_probe_is_replaced_after_reset_timeout(clock):
+    breaker = CircuitBreaker(min_calls=1, reset_timeout=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow()
+    clock[0] += 30  # never reported back, e.g. cancelled
+    assert breaker.allow()
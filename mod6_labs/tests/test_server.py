@@ -0,0 +1,33 @@
+import asyncio
+
+import server
+from cache import TTLCache
+from icon_cache import IconCache
+from server import SharedResources
+from weather_service import WeatherService
+
+
+def make_shared(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "APP_DIR", tmp_path)
+    return SharedResources(WeatherService(cache=TTLCache()), IconCache(str(tmp_path / "assets")))
+
+
+def test_sessions_of_a_user_share_one_history(tmp_path, monkeypatch):
+    async def run():
+        shared = make_shared(tmp_path, monkeypatch)
+        first = shared.history_for("alice")
+        second = shared.history_for("alice")
+        other = shared.history_for("bob")
+        first.add("manila")
+        await shared.release_history("alice")
+        kept = shared.histories.get("alice")
+        await shared.release_history("alice")
+        await shared.release_history("bob")
+        return first, second, other, kept, shared.histories
+
+    first, second, other, kept, histories = asyncio.run(run())
+    assert first is second is kept
+    assert other is not first
+    assert second.items == ["Manila"]
+    assert histories == {}
+    assert (tmp_path / "history" / "alice.json").read_text() == '["Manila"]'
@@ -0,0 +1,82 @@
+import asyncio
+
+from singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    async def run():
+        flight = SingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(5)))
+        return results, calls, flight
+
+    results, calls, flight = asyncio.run(run())
+    assert results == ["result"] * 5
+    assert calls == 1
+    assert flight.coalesced == 4
+    assert len(flight) == 0
+
+
+def test_cancelling_the_first_caller_keeps_the_call_for_the_others():
+    async def run():
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return 42
+
+        first = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second, first.cancelled()
+
+    assert asyncio.run(run()) == (42, True)
+
+
+def test_call_is_cancelled_when_every_waiter_leaves():
+    async def run():
+        flight = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def fetch():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiter = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        await asyncio.wait_for(cancelled.wait(), 1)
+        return "key" in flight
+
+    assert asyncio.run(run()) is False
+
+
+def test_errors_reach_every_caller_and_the_key_is_freed():
+    async def run():
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            flight.do("key", fetch), flight.do("key", fetch), return_exceptions=True
+        )
+        return results, len(flight)
+
+    results, remaining = asyncio.run(run())
+    assert [type(r) for r in results] == [ValueError, ValueError]
+    assert remaining == 0
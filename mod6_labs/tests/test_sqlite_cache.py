@@ -0,0 +1,52 @@
+import time
+
+from cache import SQLiteCache, make_cache_key
+
+
+def test_sqlite_cache_survives_a_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+    key = make_cache_key("weather", "Manila", "metric")
+    c = SQLiteCache(path)
+    c.set(key, {"temp": 31}, ttl=600)
+    c.close()
+
+    c = SQLiteCache(path)
+    entry = c.peek(key)
+    assert entry.value == {"temp": 31} and entry.is_fresh()
+    c.delete(key)
+    c.close()
+    assert len(SQLiteCache(path)) == 0
+
+
+def test_sqlite_cache_evictions_reach_the_disk(tmp_path):
+    path = str(tmp_path / "cache.db")
+    c = SQLiteCache(path, max_entries=1)
+    c.set(make_cache_key("weather", "a", "metric"), 1, ttl=600)
+    c.set(make_cache_key("weather", "b", "metric"), 2, ttl=600)
+    c.close()
+    assert [k[1] for k in SQLiteCache(path)._entries] == ["b"]
+
+
+def test_sqlite_cache_drops_unreadable_rows(tmp_path):
+    path = str(tmp_path / "cache.db")
+    good = make_cache_key("weather", "Manila", "metric")
+    c = SQLiteCache(path)
+    c.set(good, {"temp": 31}, ttl=600)
+    rows = [
+        ("old", '{"temp": 30}'),  # written before payloads were versioned
+        ("future", '{"version": 999, "value": 1}'),
+        ("model", '{"version": 1, "value": {"__model__": "Unknown", "data": {}}}'),
+        ("corrupt", "not json"),
+    ]
+    for city, payload in rows:
+        c._conn.execute(
+            "INSERT INTO responses VALUES ('weather', ?, 'metric', ?, ?, ?)",
+            (city, payload, time.time(), time.time() + 600),
+        )
+    c._conn.commit()
+    c.close()
+
+    c = SQLiteCache(path)
+    assert list(c._entries) == [good]
+    assert c._conn.execute("SELECT COUNT(*) FROM responses").fetchone() == (1,)
+    c.close()
@@ -0,0 +1,180 @@
+import asyncio
+import time
+
+import httpx
+
+from cache import TTLCache
+from errors import TransientServiceError, WeatherServiceError
+from resilience import CircuitBreaker, RetryPolicy
+from weather_service import WeatherService
+
+
+def make_service(handler, **kwargs):
+    """A service whose requests are answered by handler instead of the network."""
+    kwargs.setdefault("cache", TTLCache())
+    kwargs.setdefault("typed", False)
+    service = WeatherService(**kwargs)
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return service
+
+
+def test_batch_results_keep_the_callers_entries():
+    def handler(request):
+        assert request.url.path.endswith("/group")
+        ids = request.url.params["id"].split(",")
+        return httpx.Response(200, json={"list": [{"id": int(i)} for i in ids if i != "3"]})
+
+    async def run():
+        service = make_service(handler)
+        try:
+            return [result async for result in service.get_weather_many(["2", 3, 4])]
+        finally:
+            await service.close()
+
+    results = {result.city: result for result in asyncio.run(run())}
+    assert set(results) == {"2", 3, 4}
+    assert results["2"].ok and results["2"].data == {"id": 2}
+    assert not results[3].ok
+    assert results[4].ok
+
+
+def test_batch_failures_do_not_abort_the_other_cities():
+    def handler(request):
+        city = request.url.params["q"]
+        if city == "Nowhere":
+            return httpx.Response(404)
+        return httpx.Response(200, json={"name": city})
+
+    async def run():
+        service = make_service(handler)
+        try:
+            return [result async for result in service.get_weather_many(["Manila", "Nowhere", "Cebu"])]
+        finally:
+            await service.close()
+
+    results = {result.city: result for result in asyncio.run(run())}
+    assert results["Manila"].data == {"name": "Manila"}
+    assert results["Cebu"].data == {"name": "Cebu"}
+    assert "not found" in str(results["Nowhere"].error)
+
+
+def test_bundle_tolerates_a_failed_forecast():
+    def handler(request):
+        if request.url.path.endswith("/forecast"):
+            return httpx.Response(401)
+        return httpx.Response(200, json={"name": "Manila"})
+
+    async def run():
+        service = make_service(handler)
+        try:
+            return await service.get_weather_bundle("Manila")
+        finally:
+            await service.close()
+
+    assert asyncio.run(run()) == ({"name": "Manila"}, None)
+
+
+def test_bundle_raises_when_current_weather_fails():
+    def handler(request):
+        if request.url.path.endswith("/forecast"):
+            return httpx.Response(200, json={"list": []})
+        return httpx.Response(404)
+
+    async def run():
+        service = make_service(handler)
+        try:
+            await service.get_weather_bundle("Nowhere")
+        except WeatherServiceError as error:
+            return error
+        finally:
+            await service.close()
+
+    assert "not found" in str(asyncio.run(run()))
+
+
+def test_long_retry_after_fails_without_waiting():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(429, headers={"Retry-After": "120"})
+
+    async def run():
+        service = make_service(handler)
+        start = time.perf_counter()
+        try:
+            await service.get_weather("Manila")
+        except TransientServiceError as error:
+            return error, time.perf_counter() - start
+        finally:
+            await service.close()
+
+    error, elapsed = asyncio.run(run())
+    assert "Too many requests" in str(error)
+    assert len(calls) == 1
+    assert elapsed < 1
+
+
+def test_short_retry_after_is_honored():
+    responses = [httpx.Response(429, headers={"Retry-After": "0"}),
+                 httpx.Response(200, json={"name": "Manila"})]
+
+    async def run():
+        service = make_service(lambda request: responses.pop(0))
+        try:
+            return await service.get_weather("Manila"), service.retries
+        finally:
+            await service.close()
+
+    assert asyncio.run(run()) == ({"name": "Manila"}, 1)
+
+
+def test_server_errors_are_retried():
+    responses = [httpx.Response(503), httpx.Response(502),
+                 httpx.Response(200, json={"name": "Manila"})]
+
+    async def run():
+        service = make_service(
+            lambda request: responses.pop(0),
+            retry_policy=RetryPolicy(max_retries=2, base_delay=0.01),
+        )
+        try:
+            return await service.get_weather("Manila"), service.retries
+        finally:
+            await service.close()
+
+    assert asyncio.run(run()) == ({"name": "Manila"}, 2)
+
+
+def test_open_circuit_serves_cached_data():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if len(requests) == 1:
+            return httpx.Response(200, json={"name": "Manila"})
+        return httpx.Response(500)
+
+    async def run():
+        cache = TTLCache(max_stale=3600)
+        service = make_service(
+            handler,
+            cache=cache,
+            stale_while_revalidate=False,
+            retry_policy=RetryPolicy(max_retries=0),
+            circuit_breaker=CircuitBreaker(failure_threshold=0.5, min_calls=1, reset_timeout=60),
+        )
+        try:
+            await service.get_weather("Manila")
+            for key in list(cache._entries):
+                cache.set(key, cache.peek(key).value, -1)  # expire it
+            first = await service.get_weather("Manila")  # fails, opens the circuit
+            second = await service.get_weather("Manila")  # short-circuited
+            return first, second, service.circuit_breaker.state
+        finally:
+            await service.close()
+
+    first, second, state = asyncio.run(run())
+    assert first == second == {"name": "Manila"}
+    assert state == CircuitBreaker.OPEN
+    assert len(requests) == 2
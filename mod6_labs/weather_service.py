@@ -1,65 +1,293 @@
 """Weather API service layer."""
 
+import asyncio
+import logging
+import sqlite3
+import time
 import httpx
-from typing import Dict
+from dataclasses import dataclass
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Iterable, List,
+    Optional, Sequence, Tuple, Union,
+)
 from config import Config
+from errors import CircuitOpenError, TransientServiceError, WeatherServiceError
+from cache import SQLiteCache, TTLCache, make_cache_key
+from metrics import Metrics, RequestTracer
+from models import CurrentWeather, Forecast, loads
+from ratelimit import TokenBucket
+from resilience import CircuitBreaker, RetryPolicy, parse_retry_after
+from singleflight import SingleFlight
 
+try:
+    import h2  # noqa: F401  (enables HTTP/2 support in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
-class WeatherServiceError(Exception):
-    """Custom exception for weather service errors."""
-    pass
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one city in a batch fetch."""
+    
+    city: Union[str, int]
+    data: Optional[Dict] = None
+    error: Optional[WeatherServiceError] = None
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """An OpenWeatherMap API endpoint and its request settings."""
+    
+    name: str
+    url: str
+    label: str  # used in error messages, e.g. "weather data"
+    connect_timeout: float = Config.CONNECT_TIMEOUT
+    read_timeout: float = Config.TIMEOUT
+    total_timeout: float = Config.TIMEOUT
+    cache_ttl: float = 0
+    model: Optional[type] = None  # typed model the response is parsed into
+    
+    @property
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
 
 
 class WeatherService:
-    """Service for fetching weather data from OpenWeatherMap API."""
+    """
+    Service for fetching weather data from OpenWeatherMap API.
+    
+    The service owns one long-lived ``httpx.AsyncClient`` so that
+    connections (and their TCP/TLS handshakes) are reused across searches.
+    Call ``start()``/``close()`` explicitly or use it as an async context
+    manager::
     
-    def __init__(self):
+        async with WeatherService() as service:
+            weather = await service.get_weather("Manila")
+    """
+    
+    def __init__(
+        self,
+        max_connections: int = Config.MAX_CONNECTIONS,
+        max_keepalive_connections: int = Config.MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = Config.KEEPALIVE_EXPIRY,
+        http2: bool = Config.HTTP2,
+        cache=None,
+        stale_while_revalidate: bool = Config.CACHE_STALE_WHILE_REVALIDATE,
+        rate_limiter: Optional[TokenBucket] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        typed: bool = Config.TYPED_MODELS,
+        metrics: Optional[Metrics] = None,
+    ):
         self.api_key = Config.API_KEY
-        self.base_url = Config.BASE_URL
-        self.forecast_url = "https://api.openweathermap.org/data/2.5/forecast"
         self.timeout = Config.TIMEOUT
+        self.search_deadline = Config.SEARCH_DEADLINE
+        # Parse responses once into compact CurrentWeather/Forecast models
+        # (only the fields the UI uses) instead of keeping raw JSON around
+        self.typed = typed
+        # Every API call goes through _request() with one of these; add
+        # new endpoints (air quality, onecall, ...) here
+        self.endpoints: Dict[str, Endpoint] = {
+            "weather": Endpoint(
+                name="weather",
+                url=Config.BASE_URL,
+                label="weather data",
+                read_timeout=Config.WEATHER_READ_TIMEOUT,
+                total_timeout=Config.WEATHER_TOTAL_TIMEOUT,
+                cache_ttl=Config.CACHE_TTL_WEATHER,
+                model=CurrentWeather,
+            ),
+            "forecast": Endpoint(
+                name="forecast",
+                url="https://api.openweathermap.org/data/2.5/forecast",
+                label="forecast data",
+                read_timeout=Config.FORECAST_READ_TIMEOUT,
+                total_timeout=Config.FORECAST_TOTAL_TIMEOUT,
+                cache_ttl=Config.CACHE_TTL_FORECAST,
+                model=Forecast,
+            ),
+            "group": Endpoint(
+                name="group",
+                url="https://api.openweathermap.org/data/2.5/group",
+                label="weather data",
+                read_timeout=Config.WEATHER_READ_TIMEOUT,
+                total_timeout=Config.WEATHER_TOTAL_TIMEOUT,
+                cache_ttl=Config.CACHE_TTL_WEATHER,
+                model=CurrentWeather,
+            ),
+        }
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        # Silently fall back to HTTP/1.1 when the "h2" package is missing
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        # Response cache: pass any TTLCache-compatible object, or disable
+        # caching entirely with WEATHER_CACHE_ENABLED=0
+        self.cache_errors = 0
+        if cache is None and Config.CACHE_ENABLED:
+            cache = self._create_default_cache()
+        self.cache = cache
+        self.stale_while_revalidate = stale_while_revalidate
+        self._refresh_tasks: Dict[Hashable, asyncio.Task] = {}
+        # Coalesces concurrent identical requests into one upstream call
+        self.inflight = SingleFlight()
+        # Every upstream request takes a token, keeping us within the plan
+        self.rate_limiter = rate_limiter or TokenBucket.per_minute(
+            Config.RATE_LIMIT_PER_MINUTE, Config.RATE_LIMIT_BURST
+        )
+        self.retry_policy = retry_policy or RetryPolicy(
+            max_retries=Config.MAX_RETRIES,
+            base_delay=Config.RETRY_BASE_DELAY,
+            max_delay=Config.RETRY_MAX_DELAY,
+        )
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(
+            failure_threshold=Config.CIRCUIT_FAILURE_THRESHOLD,
+            window=Config.CIRCUIT_WINDOW,
+            min_calls=Config.CIRCUIT_MIN_CALLS,
+            reset_timeout=Config.CIRCUIT_RESET_TIMEOUT,
+        )
+        self.retries = 0
+        
+        # Latency histograms, request counters and live gauges; export with
+        # metrics.to_prometheus() / metrics.write_json()
+        self.metrics = metrics or Metrics()
+        self.http_inflight = 0
+        self._register_metrics()
+    
+    def _register_metrics(self):
+        """Expose live service state and its counts, read at export time."""
+        states = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+        gauge, counter = self.metrics.gauge, self.metrics.counter
+        gauge("weather_http_inflight", lambda: self.http_inflight)
+        gauge("weather_singleflight_keys", lambda: len(self.inflight))
+        counter("weather_singleflight_coalesced_total", lambda: self.inflight.coalesced)
+        counter("weather_retries_total", lambda: self.retries)
+        counter("weather_rate_limit_waits_total", lambda: self.rate_limiter.waits)
+        gauge("weather_circuit_state", lambda: states[self.circuit_breaker.state])
+        gauge("weather_circuit_failure_rate", lambda: self.circuit_breaker.failure_rate)
+        counter("weather_circuit_opened_total", lambda: self.circuit_breaker.opened_count)
+        counter("weather_cache_errors_total", lambda: self.cache_errors)
+        if self.cache is not None:
+            gauge("weather_cache_entries", lambda: len(self.cache))
+            gauge("weather_cache_hit_ratio", lambda: self.cache.stats.hit_ratio)
+            for name in ("hits", "stale_hits", "misses", "evictions", "refreshes"):
+                counter(f"weather_cache_{name}_total",
+                        lambda name=name: getattr(self.cache.stats, name))
     
-    async def get_weather(self, city: str) -> Dict:
+    def _create_default_cache(self) -> TTLCache:
+        """Build the configured cache, preferring the on-disk backend."""
+        if Config.CACHE_DB_PATH:
+            try:
+                return SQLiteCache(
+                    Config.CACHE_DB_PATH,
+                    max_entries=Config.CACHE_MAX_ENTRIES,
+                    max_stale=Config.CACHE_MAX_STALE,
+                )
+            except sqlite3.Error as e:
+                self.cache_errors += 1
+                logger.warning("Persistent cache unavailable, using memory only: %s", e)
+        return TTLCache(
+            max_entries=Config.CACHE_MAX_ENTRIES,
+            max_stale=Config.CACHE_MAX_STALE,
+        )
+    
+    async def start(self):
+        """Open the shared HTTP client. Safe to call more than once."""
+        self._ensure_client()
+        return self
+    
+    async def close(self):
+        """Close the shared HTTP client and release pooled connections."""
+        for task in list(self._refresh_tasks.values()):
+            task.cancel()
+        if self._refresh_tasks:
+            await asyncio.gather(*self._refresh_tasks.values(), return_exceptions=True)
+        self._refresh_tasks.clear()
+        self.inflight.cancel_all()
+        
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        
+        if self.cache is not None:
+            self.cache.close()
+    
+    async def __aenter__(self):
+        return await self.start()
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    def _ensure_client(self) -> httpx.AsyncClient:
+        """Return the shared client, creating it lazily if needed."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+            )
+        return self._client
+    
+    async def _request(self, endpoint: Endpoint, params: Dict, city: Optional[str] = None) -> Dict:
         """
-        Fetch current weather data for a given city.
+        Call an API endpoint and return its decoded JSON body.
+        
+        This is the single request engine every endpoint goes through: it
+        adds credentials, applies the endpoint's total timeout and maps HTTP
+        status codes and transport errors to ``WeatherServiceError``.
         
         Args:
-            city: Name of the city
+            endpoint: Endpoint to call
+            params: Query parameters specific to the call
+            city: City name for "not found" messages, if any
             
         Returns:
-            Dictionary containing weather data
+            Dictionary containing the response data
             
         Raises:
             WeatherServiceError: If the request fails
         """
-        if not city:
-            raise WeatherServiceError("City name cannot be empty")
-        
-        params = {
-            "q": city,
-            "appid": self.api_key,
-            "units": Config.UNITS,
-        }
+        params = {**params, "appid": self.api_key, "units": Config.UNITS}
         
+        with self.metrics.span(f"weather.{endpoint.name}", city=city or ""):
+            return await self._request_inner(endpoint, params, city)
+    
+    async def _request_inner(self, endpoint: Endpoint, params: Dict, city: Optional[str]) -> Dict:
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(self.base_url, params=params)
-                
-                if response.status_code == 404:
+            response = await asyncio.wait_for(
+                self._send(endpoint, params), endpoint.total_timeout
+            )
+            
+            if response.status_code == 404:
+                if city:
                     raise WeatherServiceError(f"City '{city}' not found. Please check the spelling.")
-                elif response.status_code == 401:
-                    raise WeatherServiceError("Invalid API key. Please check your configuration.")
-                elif response.status_code >= 500:
-                    raise WeatherServiceError("Weather service is currently unavailable. Please try again later.")
-                elif response.status_code != 200:
-                    raise WeatherServiceError(f"Error fetching weather data: {response.status_code}")
-                
-                return response.json()
-                
-        except httpx.TimeoutException:
-            raise WeatherServiceError("Request timed out. Please check your internet connection.")
+                raise WeatherServiceError(f"No {endpoint.label} found.")
+            elif response.status_code == 401:
+                raise WeatherServiceError("Invalid API key. Please check your configuration.")
+            elif response.status_code == 429:
+                raise TransientServiceError("Too many requests. Please try again in a moment.")
+            elif response.status_code >= 500:
+                raise TransientServiceError("Weather service is currently unavailable. Please try again later.")
+            elif response.status_code != 200:
+                raise WeatherServiceError(f"Error fetching {endpoint.label}: {response.status_code}")
+            
+            return loads(response.content)
+            
+        except (httpx.TimeoutException, asyncio.TimeoutError):
+            raise TransientServiceError("Request timed out. Please check your internet connection.")
         except httpx.NetworkError:
-            raise WeatherServiceError("Network error. Please check your internet connection.")
+            raise TransientServiceError("Network error. Please check your internet connection.")
         except httpx.HTTPError as e:
             raise WeatherServiceError(f"HTTP error occurred: {str(e)}")
         except WeatherServiceError:
@@ -67,7 +295,223 @@ class WeatherService:
         except Exception as e:
             raise WeatherServiceError(f"An unexpected error occurred: {str(e)}")
     
-    async def get_forecast(self, city: str) -> Dict:
+    async def _send(self, endpoint: Endpoint, params: Dict) -> httpx.Response:
+        """
+        Send a GET request with rate limiting, retries and circuit breaking.
+        
+        Timeouts, network errors, 5xx and 429 responses are retried with
+        exponential backoff and jitter (honoring ``Retry-After``). Once the
+        retries are used up the last response is returned, or the last
+        exception re-raised, for the caller to map into an error. A
+        ``Retry-After`` longer than ``max_delay`` or the rest of the
+        endpoint's budget ends the retries right away.
+        
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + endpoint.total_timeout
+        attempt = 0
+        while True:
+            if not self.circuit_breaker.allow():
+                raise CircuitOpenError(
+                    "Weather service is temporarily unavailable. Please try again shortly."
+                )
+            
+            await self.rate_limiter.acquire()
+            try:
+                response = await self._timed_get(endpoint, params)
+            except (httpx.TimeoutException, httpx.NetworkError):
+                self.circuit_breaker.record_failure()
+                if attempt >= self.retry_policy.max_retries:
+                    raise
+                delay = self.retry_policy.backoff(attempt)
+            else:
+                if response.status_code != 429 and response.status_code < 500:
+                    self.circuit_breaker.record_success()
+                    return response
+                self.circuit_breaker.record_failure()
+                if attempt >= self.retry_policy.max_retries:
+                    return response
+                retry_after = response.headers.get("Retry-After")
+                hinted = parse_retry_after(retry_after)
+                if hinted is not None and (
+                    hinted > self.retry_policy.max_delay or hinted > deadline - loop.time()
+                ):
+                    # Waiting that long can't fit in this search: fail now
+                    return response
+                delay = self.retry_policy.backoff(attempt, retry_after)
+            
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(delay)
+    
+    async def _timed_get(self, endpoint: Endpoint, params: Dict) -> httpx.Response:
+        """Send one GET, recording its latency, outcome and connection phases."""
+        metrics = self.metrics
+        status = "error"
+        self.http_inflight += 1
+        start = time.perf_counter()
+        try:
+            response = await self._ensure_client().get(
+                endpoint.url,
+                params=params,
+                timeout=endpoint.timeout,
+                extensions={"trace": RequestTracer(metrics, endpoint.name)},
+            )
+            status = str(response.status_code)
+            return response
+        except httpx.TimeoutException:
+            status = "timeout"
+            raise
+        finally:
+            self.http_inflight -= 1
+            metrics.observe(
+                "weather_request_seconds", time.perf_counter() - start, endpoint=endpoint.name
+            )
+            metrics.inc("weather_requests_total", endpoint=endpoint.name, status=status)
+    
+    async def _get_city(self, endpoint: Endpoint, city: str) -> Dict:
+        """
+        Look up a city on an endpoint through the cache and single-flight layers.
+        
+        Fresh cache entries are returned as-is. Stale entries are returned
+        right away while a single background task refreshes them. Misses go
+        to the network through the single-flight layer, so concurrent
+        lookups for the same key share one request.
+        """
+        if not city:
+            raise WeatherServiceError("City name cannot be empty")
+        
+        key = self._cache_key(endpoint.name, city)
+        
+        if self.cache is not None:
+            entry = self.cache.get(key)
+            if entry is not None:
+                if entry.is_fresh():
+                    return entry.value
+                if self.stale_while_revalidate:
+                    self._schedule_refresh(key, endpoint, city)
+                    return entry.value
+        
+        try:
+            return await self.inflight.do(
+                key, lambda: self._fetch_and_store(key, endpoint, city)
+            )
+        except TransientServiceError:
+            # Upstream is struggling or the circuit is open: fall back to
+            # the last known data if we have any
+            entry = self.cache.peek(key) if self.cache is not None else None
+            if entry is None:
+                raise
+            return entry.value
+    
+    async def _fetch_and_store(self, key: Hashable, endpoint: Endpoint, city: str) -> Dict:
+        """Fetch a city from the API and store the result in the cache."""
+        data = self._parse(endpoint, await self._request(endpoint, {"q": city}, city))
+        if self.cache is not None:
+            self.cache.set(key, data, endpoint.cache_ttl)
+        return data
+    
+    def _parse(self, endpoint: Endpoint, data: Dict) -> Any:
+        """Convert a raw response into the endpoint's model in typed mode."""
+        if self.typed and endpoint.model is not None:
+            return endpoint.model.from_json(data)
+        return data
+    
+    def _cache_key(self, endpoint_name: str, city: str) -> Hashable:
+        """Build a cache key; typed and raw results are cached separately."""
+        if self.typed:
+            endpoint_name = f"{endpoint_name}:model"
+        return make_cache_key(endpoint_name, city, Config.UNITS)
+    
+    def _schedule_refresh(self, key: Hashable, endpoint: Endpoint, city: str):
+        """Refresh a stale cache entry in the background (once per key)."""
+        if key in self._refresh_tasks:
+            return
+        
+        async def refresh():
+            try:
+                await self.inflight.do(
+                    key, lambda: self._fetch_and_store(key, endpoint, city)
+                )
+                self.cache.stats.refreshes += 1
+            except WeatherServiceError:
+                # Keep serving the stale copy; the next lookup retries
+                pass
+            finally:
+                self._refresh_tasks.pop(key, None)
+        
+        self._refresh_tasks[key] = asyncio.ensure_future(refresh())
+    
+    def get_cached_bundle(self, city: str) -> Tuple[Optional[Any], Optional[Any]]:
+        """
+        Return whatever is cached for a city without touching the network.
+        
+        Entries past their TTL are still returned; this is meant for
+        painting the last known data at startup or while offline.
+        
+        Args:
+            city: Name of the city
+            
+        Returns:
+            Tuple of (weather data or None, forecast data or None)
+        """
+        if self.cache is None or not city:
+            return None, None
+        
+        weather = self.cache.peek(self._cache_key("weather", city))
+        forecast = self.cache.peek(self._cache_key("forecast", city))
+        return (
+            weather.value if weather else None,
+            forecast.value if forecast else None,
+        )
+    
+    def cache_expiry(self, city: str, endpoint: str = "weather") -> Optional[float]:
+        """Return when a city's cached response from an endpoint expires, if cached."""
+        if self.cache is None or not city:
+            return None
+        entry = self.cache.peek(self._cache_key(endpoint, city))
+        return entry.expires_at if entry else None
+    
+    async def refresh_city(self, city: str, endpoints: Sequence[str] = ("weather", "forecast")):
+        """
+        Refetch a city's current weather and/or forecast, ignoring freshness.
+        
+        Used by background refreshers to update the cache ahead of expiry.
+        
+        Args:
+            city: Name of the city
+            endpoints: Which responses to refetch ("weather", "forecast")
+        
+        Raises:
+            WeatherServiceError: If any request fails
+        """
+        if not city:
+            raise WeatherServiceError("City name cannot be empty")
+        
+        async def refresh(endpoint: Endpoint):
+            key = self._cache_key(endpoint.name, city)
+            await self.inflight.do(key, lambda: self._fetch_and_store(key, endpoint, city))
+        
+        await asyncio.gather(*(refresh(self.endpoints[name]) for name in endpoints))
+    
+    async def get_weather(self, city: str) -> Union[Dict, CurrentWeather]:
+        """
+        Fetch current weather data for a given city.
+        
+        Args:
+            city: Name of the city
+            
+        Returns:
+            Dictionary containing weather data (a CurrentWeather in typed mode)
+            
+        Raises:
+            WeatherServiceError: If the request fails
+        """
+        return await self._get_city(self.endpoints["weather"], city)
+    
+    async def get_forecast(self, city: str) -> Union[Dict, Forecast]:
         """
         Fetch 5-day forecast data for a given city.
         
@@ -75,42 +519,155 @@ class WeatherService:
             city: Name of the city
             
         Returns:
-            Dictionary containing forecast data
+            Dictionary containing forecast data (a Forecast in typed mode)
             
         Raises:
             WeatherServiceError: If the request fails
         """
+        return await self._get_city(self.endpoints["forecast"], city)
+    
+    async def get_weather_bundle(self, city: str) -> Tuple[Any, Optional[Any]]:
+        """
+        Fetch current weather and forecast for a city concurrently.
+        
+        Both requests are sent at once, so the total wait is roughly the
+        slower of the two calls instead of their sum. Current weather is
+        required: if it fails, the forecast request is cancelled and the
+        error is raised. A failed forecast alone is tolerated and reported
+        as ``None`` so the current conditions can still be shown. The whole
+        search is bounded by ``search_deadline`` seconds.
+        
+        Args:
+            city: Name of the city
+            
+        Returns:
+            Tuple of (weather data, forecast data or None)
+            
+        Raises:
+            WeatherServiceError: If the current weather request fails
+        """
         if not city:
             raise WeatherServiceError("City name cannot be empty")
         
-        params = {
-            "q": city,
-            "appid": self.api_key,
-            "units": Config.UNITS,
-        }
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.search_deadline
+        weather_task = asyncio.ensure_future(self.get_weather(city))
+        forecast_task = asyncio.ensure_future(self.get_forecast(city))
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(self.forecast_url, params=params)
-                
-                if response.status_code == 404:
-                    raise WeatherServiceError(f"City '{city}' not found. Please check the spelling.")
-                elif response.status_code == 401:
-                    raise WeatherServiceError("Invalid API key. Please check your configuration.")
-                elif response.status_code >= 500:
-                    raise WeatherServiceError("Weather service is currently unavailable. Please try again later.")
-                elif response.status_code != 200:
-                    raise WeatherServiceError(f"Error fetching forecast data: {response.status_code}")
-                
-                return response.json()
-                
-        except httpx.TimeoutException:
-            raise WeatherServiceError("Request timed out. Please check your internet connection.")
-        except httpx.NetworkError:
-            raise WeatherServiceError("Network error. Please check your internet connection.")
-        except httpx.HTTPError as e:
-            raise WeatherServiceError(f"HTTP error occurred: {str(e)}")
-        except WeatherServiceError:
+            weather = await asyncio.wait_for(weather_task, self.search_deadline)
+        except asyncio.TimeoutError:
+            forecast_task.cancel()
+            await asyncio.gather(forecast_task, return_exceptions=True)
+            raise TransientServiceError("Request timed out. Please check your internet connection.")
+        except BaseException:
+            # Fatal error (or caller cancelled): don't leave the sibling running
+            forecast_task.cancel()
+            await asyncio.gather(forecast_task, return_exceptions=True)
             raise
-        except Exception as e:
-            raise WeatherServiceError(f"An unexpected error occurred: {str(e)}")
\ No newline at end of file
+        
+        try:
+            # Whatever is left of the deadline; a slow forecast must not
+            # hold back current conditions that are already here
+            forecast = await asyncio.wait_for(forecast_task, max(0, deadline - loop.time()))
+        except (WeatherServiceError, asyncio.TimeoutError):
+            forecast = None
+        
+        return weather, forecast
+    
+    async def get_weather_many(
+        self,
+        cities: Iterable[Union[str, int]],
+        concurrency: int = Config.BATCH_CONCURRENCY,
+        use_group: bool = True,
+    ) -> AsyncIterator[BatchResult]:
+        """
+        Fetch current weather for many cities, yielding results as they complete.
+        
+        At most ``concurrency`` requests run at once and every request goes
+        through the shared rate limiter. A failing city produces a
+        ``BatchResult`` with ``error`` set instead of aborting the batch.
+        Numeric OpenWeatherMap city IDs are fetched through the group
+        endpoint, up to 20 per request, when ``use_group`` is set.
+        
+        Args:
+            cities: City names and/or OpenWeatherMap city IDs
+            concurrency: Maximum number of requests in flight
+            use_group: Batch city IDs into group requests
+            
+        Yields:
+            BatchResult for each city, in completion order
+        """
+        names: List[Union[str, int]] = []
+        ids: List[Union[str, int]] = []  # kept as given, so results match the input
+        for city in cities:
+            if use_group and _is_city_id(city):
+                ids.append(city)
+            else:
+                names.append(city)
+        
+        jobs: List[Callable[[], Awaitable[List[BatchResult]]]] = [
+            lambda city=city: self._fetch_one(city) for city in names
+        ]
+        for i in range(0, len(ids), Config.GROUP_MAX_IDS):
+            chunk = ids[i:i + Config.GROUP_MAX_IDS]
+            jobs.append(lambda chunk=chunk: self._fetch_group(chunk))
+        
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def run(job):
+            async with semaphore:
+                return await job()
+        
+        tasks = [asyncio.ensure_future(run(job)) for job in jobs]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                for result in await next_done:
+                    yield result
+        finally:
+            # Consumer stopped early (break/cancel): don't leak requests
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _fetch_one(self, city: Union[str, int]) -> List[BatchResult]:
+        """Fetch one city for a batch, capturing its error."""
+        try:
+            return [BatchResult(city=city, data=await self.get_weather(str(city)))]
+        except WeatherServiceError as e:
+            return [BatchResult(city=city, error=e)]
+    
+    async def _fetch_group(self, cities: List[Union[str, int]]) -> List[BatchResult]:
+        """Fetch up to 20 cities by ID (int or numeric str) in a single group request."""
+        endpoint = self.endpoints["group"]
+        try:
+            data = await self._request(
+                endpoint, {"id": ",".join(str(int(city)) for city in cities)}
+            )
+        except WeatherServiceError as error:
+            return [BatchResult(city=city, error=error) for city in cities]
+        
+        found = {item.get("id"): item for item in data.get("list", [])}
+        results = []
+        for city in cities:
+            city_id = int(city)
+            item = found.get(city_id)
+            if item is None:
+                results.append(BatchResult(
+                    city=city,
+                    error=WeatherServiceError(f"City ID {city_id} not found."),
+                ))
+                continue
+            item = self._parse(endpoint, item)
+            if self.cache is not None:
+                key = self._cache_key("weather", str(city_id))
+                self.cache.set(key, item, endpoint.cache_ttl)
+            results.append(BatchResult(city=city, data=item))
+        return results
+
+
+def _is_city_id(city: Any) -> bool:
+    """Check whether a batch entry is an OpenWeatherMap numeric city ID."""
+    if isinstance(city, bool):
+        return False
+    return isinstance(city, int) or (isinstance(city, str) and city.strip().isdigit())
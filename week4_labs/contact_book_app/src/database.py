@@ -0,0 +1,148 @@
+import logging
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def connect(db_path):
+    """Opens a connection in WAL mode, so the loader can read while the writer commits."""
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def init_db(db_path):
+    """Creates the tasks table and its index if they don't exist."""
+    conn = connect(db_path)
+    with conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                completed INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks (completed)")
+    conn.close()
+
+
+def get_task_counts(conn):
+    """Returns (total, completed, highest id) without loading any tasks."""
+    total, max_id = conn.execute("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM tasks").fetchone()
+    completed = conn.execute("SELECT COUNT(*) FROM tasks WHERE completed = 1").fetchone()[0]
+    return total, completed, max_id
+
+
+def iter_task_pages(conn, page_size=500):
+    """Yields lists of (id, name, completed) rows in id order, one page at a time."""
+    after_id = 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, name, completed FROM tasks WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, page_size)
+        ).fetchall()
+        if not rows:
+            return
+        yield [(task_id, name, bool(completed)) for task_id, name, completed in rows]
+        after_id = rows[-1][0]
+
+
+class TaskWriter:
+    """
+    Write-behind queue for task changes.
+
+    Changes are only recorded in memory; a background thread commits
+    everything recorded during the last `interval` seconds in a single
+    transaction. Repeated changes to one task collapse into one write, so
+    bulk toggles or rapid edits cost one commit instead of one per click.
+    """
+
+    def __init__(self, db_path, interval=0.25):
+        self.db_path = db_path
+        self.interval = interval
+        self.commits = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._upserts = {}  # task id -> (id, name, completed)
+        self._deletes = set()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._conn = connect(db_path)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def saved(self, task):
+        with self._lock:
+            self._upserts[task.id] = (task.id, task.name, int(task.completed))
+            self._deletes.discard(task.id)
+        self._wake.set()
+
+    def deleted(self, task_id):
+        with self._lock:
+            self._upserts.pop(task_id, None)
+            self._deletes.add(task_id)
+        self._wake.set()
+
+    def saved_many(self, tasks):
+        with self._lock:
+            for task in tasks:
+                self._upserts[task.id] = (task.id, task.name, int(task.completed))
+                self._deletes.discard(task.id)
+        self._wake.set()
+
+    def deleted_many(self, task_ids):
+        with self._lock:
+            for task_id in task_ids:
+                self._upserts.pop(task_id, None)
+                self._deletes.add(task_id)
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            # Let more changes pile up (unless closing), then write them all at once
+            self._stop.wait(self.interval)
+            self.flush()
+
+    def flush(self):
+        """Commits all pending changes in one transaction."""
+        with self._lock:
+            upserts, self._upserts = self._upserts, {}
+            deletes, self._deletes = self._deletes, set()
+        if not upserts and not deletes:
+            return
+        try:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO tasks (id, name, completed) VALUES (?, ?, ?) "
+                    "ON CONFLICT (id) DO UPDATE SET name = excluded.name, completed = excluded.completed",
+                    upserts.values()
+                )
+                self._conn.executemany("DELETE FROM tasks WHERE id = ?", ((i,) for i in deletes))
+            self.commits += 1
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning("Error saving tasks, will retry: %s", e)
+            # Put the batch back for the next tick, unless the same task
+            # has changed again since; the newer change wins
+            with self._lock:
+                for task_id, row in upserts.items():
+                    if task_id not in self._upserts and task_id not in self._deletes:
+                        self._upserts[task_id] = row
+                for task_id in deletes:
+                    if task_id not in self._upserts:
+                        self._deletes.add(task_id)
+            self._wake.set()
+
+    def close(self):
+        """Writes anything still pending and closes the connection."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+        self._conn.close()
@@ -1,40 +1,162 @@
+import atexit
+import csv
+import sqlite3
+import threading
+from pathlib import Path
+
 import flet as ft
+from database import TaskWriter, connect, get_task_counts, init_db, iter_task_pages
+from task_io import FORMATS, read_tasks, write_tasks
+from task_list import TaskListView
+from task_model import TaskStore
+from task_search import FILTERS, SearchResults, TaskIndex
+
+DB_PATH = Path(__file__).parent / "tasks.db"
 
 class TodoApp:
-    def __init__(self, page: ft.Page):
+    def __init__(self, page: ft.Page, db_path=DB_PATH):
         self.page = page
+        self.db_path = db_path
+        init_db(db_path)
+        # Changes are saved in the background, batched into one commit per 250 ms
+        self.writer = TaskWriter(db_path, interval=0.25)
+        # The model owns the tasks and counters; the rows are just a view of it
+        self.store = TaskStore(writer=self.writer, index=TaskIndex())
+        # Disabled until the saved tasks are loaded, so new ones land after them
         self.new_task_input = ft.TextField(
             hint_text="What needs to be done?",
             bgcolor=ft.colors.WHITE,
             expand=True,
+            disabled=True,
             on_submit=self.add_task_from_event
         )
-        self.tasks_list = ft.Column()
+        self.add_button = ft.FloatingActionButton(
+            icon=ft.icons.ADD_TASK,
+            bgcolor=ft.colors.GREEN,
+            disabled=True,
+            on_click=self.add_clicked
+        )
+        self.tasks_list = TaskListView(self.store, self.create_task_row, self.bind_task_row)
         self.progress_text = ft.Text("No tasks yet", color=ft.colors.GREY)
         self.progress_bar = ft.ProgressBar(width=600, value=0)
+        self.selected = set()  # ids of the tasks picked for "Delete selected"
+
+        # Search and status filters look tasks up in the store's index; the
+        # list then shows just the matches, through the same recycled rows
+        self.filter = "all"
+        self.search_input = ft.TextField(
+            hint_text="Search tasks",
+            prefix_icon=ft.icons.SEARCH,
+            bgcolor=ft.colors.WHITE,
+            dense=True,
+            expand=True,
+            disabled=True,
+            on_change=self.search_changed
+        )
+        self.filter_row = ft.Row(
+            spacing=6,
+            disabled=True,
+            controls=[
+                ft.Chip(
+                    label=ft.Text(name.capitalize()),
+                    data=name,
+                    selected=name == self.filter,
+                    on_select=self.filter_selected
+                )
+                for name in FILTERS
+            ]
+        )
+
+        # Bulk actions; each is one model change followed by one page update
+        self.file_picker = ft.FilePicker(on_result=self.file_picked)
+        self.page.overlay.append(self.file_picker)
+        self.delete_selected_button = ft.TextButton(
+            icon=ft.icons.DELETE_SWEEP,
+            icon_color=ft.colors.RED,
+            visible=False,
+            on_click=self.delete_selected_clicked
+        )
+        self.toolbar = ft.Row(
+            wrap=True,
+            spacing=0,
+            disabled=True,
+            controls=[
+                ft.TextButton("Import", icon=ft.icons.UPLOAD_FILE, on_click=self.import_clicked),
+                ft.TextButton("Export", icon=ft.icons.DOWNLOAD, on_click=self.export_clicked),
+                ft.TextButton("Complete all", icon=ft.icons.DONE_ALL, on_click=self.complete_all_clicked),
+                ft.TextButton("Clear completed", icon=ft.icons.CLEAR_ALL, on_click=self.clear_completed_clicked),
+                self.delete_selected_button
+            ]
+        )
+
+        # One confirmation dialog, reused for every delete
+        self.delete_dialog_text = ft.Text()
+        self.delete_dialog = ft.AlertDialog(
+            modal=True,
+            title=ft.Text("Confirm Deletion"),
+            content=self.delete_dialog_text,
+            actions=[
+                ft.TextButton("Cancel", on_click=self.cancel_delete),
+                ft.TextButton("Delete", on_click=self.delete_confirmed)
+            ],
+            actions_alignment=ft.MainAxisAlignment.END
+        )
 
         self.view = ft.Column(
             width=600,
+            expand=True,
             spacing=20,
             controls=[
-                ft.Row(
-                    controls=[
-                        self.new_task_input,
-                        ft.FloatingActionButton(
-                            icon=ft.icons.ADD_TASK,
-                            bgcolor=ft.colors.GREEN,
-                            on_click=self.add_clicked
-                        )
-                    ]
-                ),
+                ft.Row(controls=[self.new_task_input, self.add_button]),
+                self.toolbar,
+                ft.Row(controls=[self.search_input]),
+                self.filter_row,
                 ft.Column(
                     spacing=6,
                     controls=[self.progress_text, self.progress_bar]
                 ),
-                self.tasks_list
+                self.tasks_list.view
             ]
         )
 
+    def load_tasks(self):
+        # Runs in a background thread: counts first, then tasks a page at a time
+        error = "unexpected error"
+        try:
+            conn = connect(self.db_path)
+            try:
+                total, completed, max_id = get_task_counts(conn)
+                self.store.reserve_ids(max_id)
+                for rows in iter_task_pages(conn, page_size=500):
+                    self.store.load(rows)
+                    self.tasks_list.refresh()
+                    self.progress_text.value = f"Loading tasks... {len(self.store)} of {total}"
+                    self.progress_bar.value = len(self.store) / total
+                    self.page.update()
+            finally:
+                conn.close()
+            error = None
+        except sqlite3.Error as ex:
+            error = str(ex)
+        finally:
+            # Whatever happened, give the app back to the user
+            self.set_busy(False)
+            self.update_progress()
+            if error:
+                self.progress_text.value = f"Loading stopped after {len(self.store)} tasks: {error}"
+            self.page.update()
+
+    def set_busy(self, busy):
+        self.new_task_input.disabled = busy
+        self.add_button.disabled = busy
+        self.toolbar.disabled = busy
+        self.search_input.disabled = busy
+        self.filter_row.disabled = busy
+        self.tasks_list.view.disabled = busy
+
+    def close(self):
+        self.writer.close()
+
     def add_task_from_event(self, e):
         self.add_task(self.new_task_input.value)
 
@@ -45,68 +167,34 @@ class TodoApp:
         task_name = task_name.strip()
         if not task_name:
             return
-        self.tasks_list.controls.append(self.create_task_row(task_name))
+        self.store.add(task_name)
+        self.tasks_list.source = self.filtered_tasks()
+        self.tasks_list.show_end()
         self.new_task_input.value = ""
         self.new_task_input.focus()
         self.update_progress()
         self.page.update()
 
-    def create_task_row(self, task_name):
-        task_text = ft.Text(task_name)
+    def create_task_row(self):
+        # Rows are recycled by the list view and hold no per-task closures:
+        # the shared handlers find the task through the controls' data
+        task_text = ft.Text()
         task_container = ft.Container(
             content=task_text,
             bgcolor=ft.colors.YELLOW_100,
             padding=ft.padding.symmetric(horizontal=6, vertical=4),
-            border_radius=4
+            border_radius=4,
+            on_click=self.select_clicked
         )
-
-        checkbox = ft.Checkbox(value=False)
-        def toggle_checkbox(e):
-            if checkbox.value:
-                task_text.text_decoration = ft.TextDecoration.LINE_THROUGH
-                task_container.bgcolor = ft.colors.LIGHT_GREEN_100
-            else:
-                task_text.text_decoration = ft.TextDecoration.NONE
-                task_container.bgcolor = ft.colors.YELLOW_100
-            self.update_progress()
-            self.page.update()
-
-        checkbox.on_change = toggle_checkbox
-
+        checkbox = ft.Checkbox(value=False, on_change=self.toggle_clicked)
         delete_button = ft.IconButton(
             icon=ft.icons.DELETE_OUTLINE,
             icon_color=ft.colors.RED,
             bgcolor=ft.colors.RED_100,
-            tooltip="Delete Task"
+            tooltip="Delete Task",
+            on_click=self.delete_clicked
         )
-
-        def confirm_delete(e):
-            def delete_confirmed(e):
-                self.tasks_list.controls.remove(task_row)
-                self.page.dialog.open = False
-                self.update_progress()
-                self.page.update()
-
-            def cancel_delete(e):
-                self.page.dialog.open = False
-                self.page.update()
-
-            self.page.dialog = ft.AlertDialog(
-                modal=True,
-                title=ft.Text("Confirm Deletion"),
-                content=ft.Text(f"Are you sure you want to delete this task?\n\n{task_name}"),
-                actions=[
-                    ft.TextButton("Cancel", on_click=cancel_delete),
-                    ft.TextButton("Delete", on_click=delete_confirmed)
-                ],
-                actions_alignment=ft.MainAxisAlignment.END
-            )
-            self.page.dialog.open = True
-            self.page.update()
-
-        delete_button.on_click = confirm_delete
-
-        task_row = ft.Row(
+        return ft.Row(
             alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
             vertical_alignment=ft.CrossAxisAlignment.CENTER,
             controls=[
@@ -114,11 +202,175 @@ class TodoApp:
                 ft.Row(spacing=0, controls=[delete_button])
             ]
         )
-        return task_row
+
+    def bind_task_row(self, task_row, task):
+        checkbox, task_container = task_row.controls[0].controls
+        delete_button = task_row.controls[1].controls[0]
+        task_row.data = checkbox.data = delete_button.data = task_container.data = task.id
+        checkbox.value = task.completed
+        task_container.content.value = task.name
+        task_container.border = ft.border.all(2, ft.colors.BLUE) if task.id in self.selected else None
+        self.style_task(task_container.content, task_container, task.completed)
+
+    def toggle_clicked(self, e):
+        task = self.store.set_completed(e.control.data, e.control.value)
+        row = self.tasks_list.row_for(e.control.data)
+        if self.filter != "all":
+            self.show_tasks()  # the task may have left the filter
+        elif task is not None and row is not None:
+            self.bind_task_row(row, task)
+        self.update_progress()
+        self.page.update()
+
+    def filtered_tasks(self):
+        # The store itself when nothing is filtered out, else just the matches
+        ids = self.store.index.search(self.search_input.value or "", self.filter)
+        return self.store if ids is None else SearchResults(self.store, ids)
+
+    def show_tasks(self, from_start=False):
+        self.tasks_list.show(self.filtered_tasks(), from_start)
+
+    def search_changed(self, e):
+        self.show_tasks(from_start=True)
+        self.page.update()
+
+    def filter_selected(self, e):
+        self.filter = e.control.data
+        for chip in self.filter_row.controls:
+            chip.selected = chip.data == self.filter
+        self.show_tasks(from_start=True)
+        self.page.update()
+
+    def select_clicked(self, e):
+        task_id = e.control.data
+        if task_id in self.selected:
+            self.selected.discard(task_id)
+        else:
+            self.selected.add(task_id)
+        row = self.tasks_list.row_for(task_id)
+        if row is not None:
+            self.bind_task_row(row, self.store.get(task_id))
+        self.update_selection()
+        self.page.update()
+
+    def update_selection(self):
+        self.delete_selected_button.text = f"Delete selected ({len(self.selected)})"
+        self.delete_selected_button.visible = bool(self.selected)
+
+    def delete_clicked(self, e):
+        task = self.store.get(e.control.data)
+        if task is not None:
+            self.confirm_delete([task.id])
+
+    def delete_selected_clicked(self, e):
+        self.confirm_delete(list(self.selected))
+
+    def clear_completed_clicked(self, e):
+        self.confirm_delete(self.store.completed_ids())
+
+    def confirm_delete(self, task_ids):
+        if not task_ids:
+            return
+        self.delete_dialog.data = task_ids
+        if len(task_ids) == 1:
+            task = self.store.get(task_ids[0])
+            self.delete_dialog_text.value = f"Are you sure you want to delete this task?\n\n{task.name}"
+        else:
+            self.delete_dialog_text.value = f"Are you sure you want to delete {len(task_ids)} tasks?"
+        self.page.dialog = self.delete_dialog
+        self.delete_dialog.open = True
+        self.page.update()
+
+    def delete_confirmed(self, e):
+        removed = self.store.remove_many(self.delete_dialog.data)
+        if removed:
+            self.selected.difference_update(task.id for task in removed)
+            self.show_tasks()
+        self.delete_dialog.open = False
+        self.update_progress()
+        self.update_selection()
+        self.page.update()
+
+    def complete_all_clicked(self, e):
+        if self.store.set_all_completed(True):
+            self.tasks_list.source = self.filtered_tasks()
+            self.tasks_list.refresh(rebind=True)
+        self.update_progress()
+        self.page.update()
+
+    def import_clicked(self, e):
+        self.file_picker.data = "import"
+        self.file_picker.pick_files(dialog_title="Import tasks", allowed_extensions=list(FORMATS))
+
+    def export_clicked(self, e):
+        self.file_picker.data = "export"
+        self.file_picker.save_file(
+            dialog_title="Export tasks",
+            file_name="tasks.json",
+            allowed_extensions=list(FORMATS)
+        )
+
+    def file_picked(self, e):
+        if self.file_picker.data == "import" and e.files:
+            threading.Thread(target=self.import_tasks, args=(e.files[0].path,), daemon=True).start()
+        elif self.file_picker.data == "export" and e.path:
+            path = e.path if Path(e.path).suffix else e.path + ".json"
+            # Snapshot now, so the file matches the list as it was when picked
+            threading.Thread(target=self.export_tasks, args=(list(self.store), path), daemon=True).start()
+
+    def import_tasks(self, path):
+        # Runs in a background thread. Tasks are added a batch at a time and
+        # only the progress controls are sent while it runs; the list itself
+        # is redrawn once, at the end
+        self.set_busy(True)
+        self.page.update()
+        imported = 0
+
+        def show_progress(fraction):
+            self.progress_text.value = f"Importing tasks... {imported} added"
+            self.progress_bar.value = fraction
+            self.page.update(self.progress_text, self.progress_bar)
+
+        error = "unexpected error"
+        try:
+            for batch in read_tasks(path, on_progress=show_progress):
+                imported += len(self.store.add_many(batch))
+            error = None
+        except (OSError, ValueError, csv.Error) as ex:
+            error = str(ex)
+        finally:
+            # Whatever happened, give the app back to the user
+            self.tasks_list.source = self.filtered_tasks()
+            self.tasks_list.show_end()
+            self.set_busy(False)
+            self.update_progress()
+            if error:
+                self.progress_text.value = f"Import stopped after {imported} tasks: {error}"
+            self.page.update()
+
+    def export_tasks(self, tasks, path):
+        try:
+            count = write_tasks(tasks, path)
+            self.progress_text.value = f"Exported {count} tasks to {Path(path).name}"
+        except (OSError, ValueError) as ex:
+            self.progress_text.value = f"Export failed: {ex}"
+        self.page.update(self.progress_text)
+
+    def cancel_delete(self, e):
+        self.delete_dialog.open = False
+        self.page.update()
+
+    def style_task(self, task_text, task_container, completed):
+        if completed:
+            task_text.text_decoration = ft.TextDecoration.LINE_THROUGH
+            task_container.bgcolor = ft.colors.LIGHT_GREEN_100
+        else:
+            task_text.text_decoration = ft.TextDecoration.NONE
+            task_container.bgcolor = ft.colors.YELLOW_100
 
     def update_progress(self):
-        total = len(self.tasks_list.controls)
-        completed = sum(1 for row in self.tasks_list.controls if row.controls[0].controls[0].value)
+        total = self.store.total
+        completed = self.store.completed
         if total == 0:
             self.progress_text.value = "No tasks yet"
             self.progress_bar.value = 0
@@ -132,7 +384,6 @@ def main(page: ft.Page):
     page.window_height = 700
     page.window_resizable = False
     page.bgcolor = ft.colors.LIGHT_BLUE_50
-    page.scroll = "auto"
     page.horizontal_alignment = ft.CrossAxisAlignment.CENTER
     page.vertical_alignment = ft.MainAxisAlignment.START
 
@@ -144,6 +395,9 @@ def main(page: ft.Page):
 
     app = TodoApp(page)
     page.add(app.view)
+    # Pending writes are flushed when the app exits
+    atexit.register(app.close)
+    threading.Thread(target=app.load_tasks, daemon=True).start()
 
 if __name__ == "__main__":
     ft.app(target=main)
@@ -0,0 +1,165 @@
+import codecs
+import csv
+import json
+import os
+from pathlib import Path
+
+FORMATS = ("txt", "csv", "json")
+
+_TRUE = {"1", "true", "yes", "y", "x", "done"}
+_WHITESPACE = " \t\r\n"
+
+
+def _format(path):
+    suffix = Path(path).suffix.lower().lstrip(".")
+    if suffix not in FORMATS:
+        raise ValueError(f"Unsupported file type '.{suffix}'. Use .txt, .csv or .json.")
+    return suffix
+
+
+def _is_true(value):
+    # "false" and "0" from hand-written files must not count as completed
+    if isinstance(value, str):
+        return value.strip().lower() in _TRUE
+    return bool(value)
+
+
+def read_tasks(path, on_progress=None, batch_size=1000):
+    """
+    Streams tasks from a .txt, .csv or .json file as batches of (name, completed).
+
+    The file is read incrementally, so very large files never sit in memory
+    whole. on_progress, if given, is called with the fraction of the file
+    read so far after every batch.
+    """
+    fmt = _format(path)
+    size = os.path.getsize(path) or 1
+    with open(path, "rb") as f:
+        # utf-8-sig drops a byte order mark at the start of the file
+        text = codecs.getincrementaldecoder("utf-8-sig")()
+        lines = (text.decode(raw) for raw in f)
+        if fmt == "txt":
+            tasks = _parse_txt(lines)
+        elif fmt == "csv":
+            tasks = _parse_csv(lines)
+        else:
+            tasks = _parse_json(f)
+
+        batch = []
+        try:
+            for name, completed in tasks:
+                name = name.strip()
+                if not name:
+                    continue
+                batch.append((name, completed))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+                    if on_progress:
+                        on_progress(f.tell() / size)
+        except Exception:
+            # Hand over what was read before the bad record, then fail
+            if batch:
+                yield batch
+            raise
+        if batch:
+            yield batch
+        if on_progress:
+            on_progress(1.0)
+
+
+def _parse_txt(lines):
+    # One task per line; "[x] " / "[ ] " prefixes (as exported) set the state
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:4].lower() == "[x] ":
+            yield line[4:], True
+        elif line[:4] == "[ ] ":
+            yield line[4:], False
+        else:
+            yield line, False
+
+
+def _parse_csv(lines):
+    # Columns: name[, completed]; a header row is skipped
+    for i, row in enumerate(csv.reader(lines)):
+        if not row:
+            continue
+        if i == 0 and row[0].strip().lower() in ("name", "task"):
+            continue
+        completed = len(row) > 1 and _is_true(row[1])
+        yield row[0], completed
+
+
+def _parse_json(f, chunk_size=1 << 16):
+    # An array of strings or {"name": ..., "completed": ...} objects, decoded
+    # one element at a time from a sliding buffer
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer, pos, eof = "", 0, False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[pos:] + text.decode(chunk, final=eof)
+        pos = 0
+
+    def skip(chars):
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in chars:
+                pos += 1
+            if pos < len(buffer) or eof:
+                return
+            fill()
+
+    skip(_WHITESPACE)
+    if pos >= len(buffer):
+        return  # empty file
+    if buffer[pos] != "[":
+        raise ValueError("JSON file must contain an array of tasks.")
+    pos += 1
+    while True:
+        skip(_WHITESPACE + ",")
+        if pos >= len(buffer):
+            raise ValueError("JSON array is not closed.")
+        if buffer[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill()  # element cut off at the end of the buffer: read more
+            continue
+        pos = end
+        if isinstance(item, str):
+            yield item, False
+        elif isinstance(item, dict):
+            yield str(item.get("name") or item.get("task") or ""), _is_true(item.get("completed", False))
+
+
+def write_tasks(tasks, path):
+    """Writes tasks to a .txt, .csv or .json file (picked by extension); returns the count."""
+    fmt = _format(path)
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if fmt == "txt":
+            for task in tasks:
+                f.write(f"{'[x]' if task.completed else '[ ]'} {task.name}\n")
+                count += 1
+        elif fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(["name", "completed"])
+            for task in tasks:
+                writer.writerow([task.name, int(task.completed)])
+                count += 1
+        else:
+            f.write("[")
+            for task in tasks:
+                f.write(",\n" if count else "\n")
+                f.write(json.dumps({"name": task.name, "completed": task.completed}))
+                count += 1
+            f.write("\n]\n")
+    return count
@@ -0,0 +1,79 @@
+import flet as ft
+
+ITEM_EXTENT = 48  # fixed row height, so scroll offsets map straight to task positions
+
+
+class TaskListView:
+    """
+    Windowed view of a TaskStore, or of any source with the same len(),
+    ids() and get() (such as task_search.SearchResults).
+
+    Only a window of rows around the scroll position exists as controls.
+    Rows are built the first time they are needed and then reused: when
+    the user scrolls near either end of the window, it slides over the
+    store and the same row controls are rebound to other tasks, so a list
+    of 10,000 tasks costs no more to render than one of a hundred.
+    """
+
+    def __init__(self, source, create_row, bind_row, window=60, step=20):
+        self.source = source
+        self.create_row = create_row  # () -> row
+        self.bind_row = bind_row  # (row, task) -> None
+        self.window = window
+        self.step = step
+        self.start = 0
+        self.rows = []  # row pool; the first len(view.controls) are on screen
+        self.bound = {}  # task id -> row currently showing it
+        self.view = ft.ListView(
+            expand=True,
+            spacing=0,
+            item_extent=ITEM_EXTENT,
+            on_scroll=self.on_scroll,
+            on_scroll_interval=50,
+        )
+
+    def refresh(self, rebind=False):
+        """Binds the row pool to the tasks in the current window."""
+        self.start = max(0, min(self.start, len(self.source) - self.window))
+        ids = self.source.ids(self.start, self.start + self.window)
+        while len(self.rows) < len(ids):
+            self.rows.append(self.create_row())
+        for row, task_id in zip(self.rows, ids):
+            if rebind or row.data != task_id:
+                self.bind_row(row, self.source.get(task_id))
+        self.view.controls = self.rows[:len(ids)]
+        self.bound = {row.data: row for row in self.view.controls}
+
+    def show(self, source, from_start=False):
+        """Switches to another source, e.g. search results, rebinding only the rows that change."""
+        self.source = source
+        if from_start:
+            self.start = 0
+            if self.view.page is not None:
+                self.view.scroll_to(offset=0, duration=0)
+        self.refresh()
+
+    def row_for(self, task_id):
+        """Returns the row showing a task, or None if it is outside the window."""
+        return self.bound.get(task_id)
+
+    def show_end(self):
+        """Moves the window to the newest tasks."""
+        self.start = max(0, len(self.source) - self.window)
+        self.refresh()
+
+    def on_scroll(self, e):
+        if e.pixels is None or e.max_scroll_extent is None:
+            return
+        edge = ITEM_EXTENT * 5
+        if e.pixels >= e.max_scroll_extent - edge and self.start + self.window < len(self.source):
+            shift = min(self.step, len(self.source) - self.window - self.start)
+        elif e.pixels <= edge and self.start > 0:
+            shift = -min(self.step, self.start)
+        else:
+            return
+        self.start += shift
+        self.refresh()
+        self.view.update()
+        # Keep the same tasks under the user's finger after the window slid
+        self.view.scroll_to(offset=e.pixels - shift * ITEM_EXTENT, duration=0)
@@ -0,0 +1,151 @@
+class Task:
+    """A single to-do item."""
+
+    __slots__ = ("id", "name", "completed")
+
+    def __init__(self, task_id, name, completed=False):
+        self.id = task_id
+        self.name = name
+        self.completed = completed
+
+
+class TaskStore:
+    """Ordered tasks keyed by id, with running totals kept up to date on every change."""
+
+    def __init__(self, writer=None, index=None):
+        self.tasks = {}  # id -> Task, in insertion order
+        self.writer = writer  # persists changes (see database.TaskWriter), if set
+        self.index = index  # search index kept in step (see task_search.TaskIndex), if set
+        self.completed = 0
+        self._next_id = 1
+        self._order = []  # ids by position; rebuilt lazily after a removal
+
+    @property
+    def total(self):
+        return len(self.tasks)
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def __iter__(self):
+        return iter(self.tasks.values())
+
+    def get(self, task_id):
+        return self.tasks.get(task_id)
+
+    def ids(self, start=0, stop=None):
+        """Returns the ids of the tasks at positions start..stop."""
+        if self._order is None:
+            self._order = list(self.tasks)
+        return self._order[start:stop]
+
+    def add(self, name, completed=False):
+        """Adds a task and returns it."""
+        task = Task(self._next_id, name, completed)
+        self._next_id += 1
+        self.tasks[task.id] = task
+        if self._order is not None:
+            self._order.append(task.id)
+        if completed:
+            self.completed += 1
+        if self.index is not None:
+            self.index.add(task)
+        if self.writer is not None:
+            self.writer.saved(task)
+        return task
+
+    def add_many(self, rows):
+        """Adds (name, completed) pairs in one go and returns the new tasks."""
+        tasks = []
+        for name, completed in rows:
+            task = Task(self._next_id, name, completed)
+            self._next_id += 1
+            self.tasks[task.id] = task
+            tasks.append(task)
+            if completed:
+                self.completed += 1
+        if self._order is not None:
+            self._order.extend(task.id for task in tasks)
+        if self.index is not None:
+            for task in tasks:
+                self.index.add(task)
+        if self.writer is not None:
+            self.writer.saved_many(tasks)
+        return tasks
+
+    def load(self, rows):
+        """Adds already-saved (id, name, completed) rows without writing them back."""
+        for task_id, name, completed in rows:
+            task = self.tasks[task_id] = Task(task_id, name, completed)
+            if self.index is not None:
+                self.index.add(task)
+            if self._order is not None:
+                self._order.append(task_id)
+            if completed:
+                self.completed += 1
+            if task_id >= self._next_id:
+                self._next_id = task_id + 1
+
+    def reserve_ids(self, max_id):
+        """Makes new tasks get ids above max_id (e.g. before the saved ones are loaded)."""
+        self._next_id = max(self._next_id, max_id + 1)
+
+    def set_completed(self, task_id, completed):
+        """Marks a task done or not done; returns the task, or None if it does not exist."""
+        task = self.tasks.get(task_id)
+        if task is None or task.completed == completed:
+            return task
+        task.completed = completed
+        self.completed += 1 if completed else -1
+        if self.index is not None:
+            self.index.set_completed(task)
+        if self.writer is not None:
+            self.writer.saved(task)
+        return task
+
+    def set_all_completed(self, completed=True):
+        """Marks every task done (or not done); returns the tasks that changed."""
+        changed = [task for task in self.tasks.values() if task.completed != completed]
+        for task in changed:
+            task.completed = completed
+            if self.index is not None:
+                self.index.set_completed(task)
+        self.completed = len(self.tasks) if completed else 0
+        if changed and self.writer is not None:
+            self.writer.saved_many(changed)
+        return changed
+
+    def completed_ids(self):
+        return [task.id for task in self.tasks.values() if task.completed]
+
+    def remove(self, task_id):
+        """Removes a task; returns it, or None if it does not exist."""
+        task = self.tasks.pop(task_id, None)
+        if task is None:
+            return None
+        self._order = None
+        if task.completed:
+            self.completed -= 1
+        if self.index is not None:
+            self.index.remove(task)
+        if self.writer is not None:
+            self.writer.deleted(task_id)
+        return task
+
+    def remove_many(self, task_ids):
+        """Removes several tasks at once; returns the ones that existed."""
+        removed = []
+        for task_id in task_ids:
+            task = self.tasks.pop(task_id, None)
+            if task is None:
+                continue
+            removed.append(task)
+            if task.completed:
+                self.completed -= 1
+            if self.index is not None:
+                self.index.remove(task)
+        if removed:
+            self._order = None
+            if self.writer is not None:
+                self.writer.deleted_many([task.id for task in removed])
+        return removed
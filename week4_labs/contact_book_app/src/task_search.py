@@ -0,0 +1,125 @@
+import re
+from bisect import bisect_left
+
+FILTERS = ("all", "active", "completed")
+
+_WORD = re.compile(r"\w+")
+
+
+def words(text):
+    """Returns the distinct lowercase words in text."""
+    return set(_WORD.findall(text.lower()))
+
+
+class TaskIndex:
+    """
+    Inverted index over task names, kept up to date by the TaskStore.
+
+    Each word maps to the ids of the tasks containing it. The words are
+    also kept sorted, so a search term finds every word it is a prefix of
+    with a binary search rather than a pass over the tasks. Completed ids
+    are tracked too, so the status filters need no scan either.
+    """
+
+    def __init__(self):
+        self.postings = {}  # word -> ids of the tasks containing it
+        self.ids = set()
+        self.completed = set()
+        self._vocabulary = []  # sorted words, without duplicates
+        self._new_words = []  # added since the vocabulary was last sorted
+
+    def add(self, task):
+        self.ids.add(task.id)
+        if task.completed:
+            self.completed.add(task.id)
+        for word in words(task.name):
+            ids = self.postings.get(word)
+            if ids is None:
+                ids = self.postings[word] = set()
+                self._new_words.append(word)
+            ids.add(task.id)
+
+    def remove(self, task):
+        self.ids.discard(task.id)
+        self.completed.discard(task.id)
+        for word in words(task.name):
+            ids = self.postings.get(word)
+            if ids is not None:
+                ids.discard(task.id)
+                if not ids:
+                    del self.postings[word]
+                    i = bisect_left(self._vocabulary, word)
+                    if i < len(self._vocabulary) and self._vocabulary[i] == word:
+                        del self._vocabulary[i]
+
+    def set_completed(self, task):
+        if task.completed:
+            self.completed.add(task.id)
+        else:
+            self.completed.discard(task.id)
+
+    def vocabulary(self):
+        # New words are inserted one by one while they are few (typing, single
+        # adds), and the whole list is re-sorted after loads and imports
+        if self._new_words:
+            if len(self._new_words) > 100:
+                self._vocabulary = sorted(self.postings)
+            else:
+                for word in self._new_words:
+                    if word not in self.postings:
+                        continue  # removed again before it was merged
+                    i = bisect_left(self._vocabulary, word)
+                    if i == len(self._vocabulary) or self._vocabulary[i] != word:
+                        self._vocabulary.insert(i, word)
+            self._new_words = []
+        return self._vocabulary
+
+    def matching(self, prefix):
+        """Returns the ids of the tasks with a word starting with prefix."""
+        vocabulary = self.vocabulary()
+        ids = set()
+        i = bisect_left(vocabulary, prefix)
+        while i < len(vocabulary) and vocabulary[i].startswith(prefix):
+            ids.update(self.postings.get(vocabulary[i], ()))
+            i += 1
+        return ids
+
+    def search(self, text="", status="all"):
+        """
+        Returns the ids, in list order, of the tasks that have a word starting
+        with each word of text and match the status filter, or None if
+        nothing is filtered out.
+        """
+        terms = words(text)
+        if not terms and status == "all":
+            return None
+        result = None
+        # Longest terms first: they match least, keeping the intersections small
+        for term in sorted(terms, key=len, reverse=True):
+            ids = self.matching(term)
+            result = ids if result is None else result & ids
+            if not result:
+                return []
+        if status == "completed":
+            result = self.completed if result is None else result & self.completed
+        elif status == "active":
+            result = (self.ids if result is None else result) - self.completed
+        # Ids grow in insertion order, so sorting them gives list order
+        return sorted(result)
+
+
+class SearchResults:
+    """A read-only subset of a TaskStore that TaskListView can show in its place."""
+
+    def __init__(self, store, ids):
+        self.store = store
+        self._ids = ids
+
+    def __len__(self):
+        return len(self._ids)
+
+    def get(self, task_id):
+        return self.store.get(task_id)
+
+    def ids(self, start=0, stop=None):
+        return self._ids[start:stop]
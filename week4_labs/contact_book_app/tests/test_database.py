@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+from database import TaskWriter, connect, init_db
+from task_model import TaskStore
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.saved_ids, self.deleted_ids = [], []
+
+    def saved(self, task):
+        self.saved_ids.append(task.id)
+
+    def saved_many(self, tasks):
+        self.saved_ids.extend(t.id for t in tasks)
+
+    def deleted(self, task_id):
+        self.deleted_ids.append(task_id)
+
+    def deleted_many(self, ids):
+        self.deleted_ids.extend(ids)
+
+
+def test_loaded_tasks_are_not_written_back():
+    writer = RecordingWriter()
+    store = TaskStore(writer=writer)
+    store.reserve_ids(10)
+    store.load([(3, "old", True)])
+    task = store.add("new")
+    assert task.id == 11
+    assert writer.saved_ids == [11]
+    store.set_all_completed(True)
+    assert writer.saved_ids == [11, 11]
+    store.remove_many([3, 11, 99])
+    assert writer.deleted_ids == [3, 11]
+
+
+def test_failed_flush_is_retried_without_losing_newer_changes(tmp_path):
+    path = str(tmp_path / "tasks.db")
+    connect(path).close()  # no tasks table yet: the first flush fails
+    writer = TaskWriter(path, interval=60)  # flushed by hand below
+    try:
+        writer.saved_many([SimpleNamespace(id=i, name=f"task {i}", completed=False) for i in (1, 2, 3)])
+        writer.flush()
+        assert writer.errors == 1 and writer.commits == 0
+
+        writer.saved(SimpleNamespace(id=1, name="renamed", completed=True))
+        writer.deleted(2)
+        init_db(path)
+        writer.flush()
+        assert writer.commits == 1
+    finally:
+        writer.close()
+
+    conn = connect(path)
+    rows = conn.execute("SELECT id, name, completed FROM tasks ORDER BY id").fetchall()
+    conn.close()
+    assert rows == [(1, "renamed", 1), (3, "task 3", 0)]
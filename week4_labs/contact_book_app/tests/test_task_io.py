@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from task_io import _parse_json, read_tasks, write_tasks
+from task_model import TaskStore
+
+
+def read_all(path, **kwargs):
+    return [task for batch in read_tasks(path, **kwargs) for task in batch]
+
+
+@pytest.mark.parametrize("fmt", ["txt", "csv", "json"])
+def test_round_trip(tmp_path, fmt):
+    store = TaskStore()
+    store.add("Buy milk")
+    store.add('Say "hi", then leave', completed=True)
+    store.add("Café ☕")
+    path = tmp_path / f"tasks.{fmt}"
+    assert write_tasks(store, path) == 3
+    assert read_all(path) == [(t.name, t.completed) for t in store]
+
+
+def test_json_elements_split_across_chunks(tmp_path):
+    # Multi-byte characters and elements straddling every chunk boundary
+    names = [f"tâsk ☃ {i}" for i in range(300)]
+    path = tmp_path / "tasks.json"
+    path.write_text(json.dumps([{"name": n, "completed": i % 2 == 0} for i, n in enumerate(names)]), encoding="utf-8")
+    with open(path, "rb") as f:
+        tasks = list(_parse_json(f, chunk_size=7))
+    assert tasks == [(n, i % 2 == 0) for i, n in enumerate(names)]
+
+
+def test_json_accepts_plain_strings_and_a_bom(tmp_path):
+    path = tmp_path / "tasks.json"
+    path.write_bytes(b"\xef\xbb\xbf" + json.dumps(["a", {"task": "b", "completed": True}, 3]).encode())
+    assert read_all(path) == [("a", False), ("b", True)]
+
+
+@pytest.mark.parametrize("text", ['{"name": "a"}', '[{"name": "a"}, {"name": '])
+def test_malformed_json_raises_value_error(tmp_path, text):
+    path = tmp_path / "tasks.json"
+    path.write_text(text)
+    with pytest.raises(ValueError):
+        read_all(path)
+
+
+def test_tasks_before_a_bad_record_are_kept(tmp_path):
+    path = tmp_path / "tasks.json"
+    path.write_text('[{"name": "a"}, {"name": "b"}, {"name": ')
+    batches = []
+    with pytest.raises(ValueError):
+        for batch in read_tasks(path):
+            batches.append(batch)
+    assert batches == [[("a", False), ("b", False)]]
+
+
+def test_batches_and_progress(tmp_path):
+    path = tmp_path / "tasks.txt"
+    path.write_text("".join(f"[x] task {i}\n\n" for i in range(25)))
+    progress = []
+    batches = list(read_tasks(path, on_progress=progress.append, batch_size=10))
+    assert [len(b) for b in batches] == [10, 10, 5]
+    assert all(done for b in batches for _, done in b)
+    assert progress[-1] == 1.0 and progress == sorted(progress)
+
+
+def test_csv_header_is_optional(tmp_path):
+    path = tmp_path / "tasks.csv"
+    path.write_text("a,yes\nb\n")
+    assert read_all(path) == [("a", True), ("b", False)]
+
+
+def test_unknown_extension(tmp_path):
+    with pytest.raises(ValueError):
+        read_all(tmp_path / "tasks.xml")
+
+
+@pytest.mark.parametrize("fmt", ["txt", "csv"])
+def test_bom_is_dropped_from_text_files(tmp_path, fmt):
+    path = tmp_path / f"tasks.{fmt}"
+    path.write_bytes(b"\xef\xbb\xbfname\nfirst\n\xef\xbb\xbfsecond\n")
+    # Only the start of the file is a byte order mark; the header row is skipped in csv
+    expected = ["first", "\ufeffsecond"] if fmt == "csv" else ["name", "first", "\ufeffsecond"]
+    assert [name for name, _ in read_all(path)] == expected
+
+
+def test_json_completed_strings(tmp_path):
+    path = tmp_path / "tasks.json"
+    values = ("false", "0", "", "true", "1", 1, 0, None)
+    items = [{"name": f"task {i}", "completed": value} for i, value in enumerate(values)]
+    path.write_text(json.dumps(items))
+    assert [completed for _, completed in read_all(path)] == [False, False, False, True, True, True, False, False]
@@ -0,0 +1,26 @@
+from task_model import TaskStore
+
+
+def test_counters_follow_every_change():
+    store = TaskStore()
+    store.add_many([("a", True), ("b", False), ("c", False)])
+    assert (store.total, store.completed) == (3, 1)
+    store.set_completed(2, True)
+    store.set_completed(2, True)  # no change
+    assert store.completed == 2
+    store.remove(1)
+    assert (store.total, store.completed) == (2, 1)
+    store.set_all_completed(True)
+    assert store.completed == 2
+    assert store.remove_many(store.completed_ids())
+    assert (store.total, store.completed) == (0, 0)
+
+
+def test_order_survives_removals():
+    store = TaskStore()
+    for name in "abcde":
+        store.add(name)
+    store.remove_many([2, 4])
+    store.add("f")
+    assert store.ids() == [1, 3, 5, 6]
+    assert store.ids(1, 3) == [3, 5]
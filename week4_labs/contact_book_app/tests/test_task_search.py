@@ -0,0 +1,66 @@
+from task_model import TaskStore
+from task_search import SearchResults, TaskIndex
+
+
+def make_store(*names):
+    store = TaskStore(index=TaskIndex())
+    for name in names:
+        store.add(name)
+    return store
+
+
+def test_every_term_matches_a_word_prefix():
+    store = make_store("Buy milk", "Buy bread", "Call mom", "milkshake recipe")
+    index = store.index
+    assert index.search("bu") == [1, 2]
+    assert index.search("MIL") == [1, 4]
+    assert index.search("buy mi") == [1]
+    assert index.search("ilk") == []
+    assert index.search("") is None
+    assert index.search("  ,, ") is None
+
+
+def test_status_filters():
+    store = make_store("a one", "a two", "a three")
+    store.set_completed(2, True)
+    index = store.index
+    assert index.search(status="completed") == [2]
+    assert index.search(status="active") == [1, 3]
+    assert index.search("t", status="active") == [3]
+    store.set_all_completed(True)
+    assert index.search(status="active") == []
+
+
+def test_index_follows_removals():
+    store = make_store("buy milk", "buy eggs")
+    store.remove(1)
+    assert store.index.search("milk") == []
+    store.remove_many([2])
+    assert store.index.search("buy") == []
+    assert store.index.postings == {}
+
+
+def test_vocabulary_stays_free_of_duplicates():
+    store = make_store()
+    for _ in range(3):
+        task = store.add("buy milk")
+        store.index.search("b")
+        store.remove(task.id)
+        store.add("buy milk")
+        store.index.search("b")
+    assert store.index.vocabulary() == ["buy", "milk"]
+
+
+def test_bulk_adds_rebuild_the_vocabulary():
+    store = TaskStore(index=TaskIndex())
+    store.add_many((f"task {i}", False) for i in range(500))
+    assert store.index.search("task 49") == list(range(50, 51)) + list(range(491, 501))
+    assert len(store.index.vocabulary()) == 501
+
+
+def test_search_results_source():
+    store = make_store("a", "b", "a c")
+    results = SearchResults(store, store.index.search("a"))
+    assert len(results) == 2
+    assert results.ids(1) == [3]
+    assert results.get(3).name == "a c"